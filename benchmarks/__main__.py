@@ -0,0 +1,104 @@
+import os, sys, json, random, tempfile, timeit, argparse
+from benchmarks.corpus import generate_corpus, generate_markdown, inline_text
+from benchmarks import memory
+from inline_markdown import text_to_textnodes
+from markdown_blocks import markdown_to_blocks, markdown_to_html_node
+from gencontent import generate_pages_recursive
+
+TEMPLATE = '<!doctype html><title>{{ Title }}</title><link href="/index.css"><article>{{ Content }}</article>'
+
+
+def best_of(func, repeat, number):
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def micro_benchmarks(seed, repeat):
+    rng = random.Random(seed)
+    paragraph = inline_text(rng, 60, links=5)
+    link_paragraph = inline_text(rng, 200, links=200)
+    document = generate_markdown(rng, blocks=200)
+    blocks = markdown_to_blocks(document)
+    tree = markdown_to_html_node(document)
+    cases = {
+        "text_to_textnodes": (lambda: text_to_textnodes(paragraph), 2000),
+        "text_to_textnodes_link_dense": (lambda: text_to_textnodes(link_paragraph), 200),
+        "markdown_to_blocks": (lambda: markdown_to_blocks(document), 500),
+        "markdown_to_html_node": (lambda: markdown_to_html_node(document), 20),
+        "parent_to_html": (lambda: tree.to_html(), 50),
+    }
+    results = {}
+    for name, (func, number) in cases.items():
+        seconds = best_of(func, repeat, number)
+        results[name] = {"seconds": seconds, "ops_per_second": 1 / seconds}
+    results["markdown_to_html_node"]["blocks"] = len(blocks)
+    return results
+
+
+def end_to_end(pages, seed, jobs):
+    with tempfile.TemporaryDirectory() as tmp:
+        content = os.path.join(tmp, "content")
+        template = os.path.join(tmp, "template.html")
+        with open(template, 'w') as f:
+            f.write(TEMPLATE)
+        generate_corpus(content, pages, seed)
+        dest = os.path.join(tmp, "docs")
+        stdout = sys.stdout
+        sys.stdout = open(os.devnull, 'w')
+        try:
+            seconds = timeit.timeit(lambda: generate_pages_recursive("/", content, template, dest, jobs=jobs), number=1)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+    return {"seconds": seconds, "pages": pages, "pages_per_second": pages / seconds, "jobs": jobs}
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, result in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if previous is None or "seconds" not in result:
+            continue
+        ratio = result["seconds"] / previous["seconds"]
+        result["baseline_ratio"] = ratio
+        if ratio > threshold:
+            regressions.append(f"{name}: {ratio:.2f}x slower than baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the markdopus benchmarks")
+    parser.add_argument("--pages", type=int, default=500, help="pages in the end-to-end corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail if a benchmark is slower than in this results file")
+    parser.add_argument("--threshold", type=float, default=1.5, help="allowed slowdown ratio for --compare")
+    args = parser.parse_args()
+
+    results = {
+        "python": sys.version.split()[0],
+        "seed": args.seed,
+        "benchmarks": micro_benchmarks(args.seed, args.repeat),
+        "memory": memory.run(20_000),
+    }
+    results["benchmarks"]["generate_pages_recursive"] = end_to_end(args.pages, args.seed, args.jobs)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=1)
+
+    for name, result in results["benchmarks"].items():
+        ratio = f"  ({result['baseline_ratio']:.2f}x baseline)" if "baseline_ratio" in result else ""
+        print(f"{name:<30} {result['seconds'] * 1e3:>10.3f} ms{ratio}")
+    print(f"Results written to {args.output}")
+    if regressions:
+        print("\n".join(["Regressions:"] + regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import os, random, argparse
+
+WORDS = (
+    "ring shire elf dwarf wizard river mountain forest road tower king hobbit sword "
+    "song star shadow light council journey friend fire stone ancient silver gate"
+).split()
+
+DEFAULT_MIX = {
+    "heading": 2,
+    "paragraph": 6,
+    "link_paragraph": 2,
+    "unordered_list": 2,
+    "ordered_list": 1,
+    "quote": 1,
+    "code": 1,
+}
+
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def inline_text(rng, count, links=0):
+    parts = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.08:
+            parts.append(f"**{words(rng, 2)}**")
+        elif roll < 0.14:
+            parts.append(f"_{words(rng, 2)}_")
+        elif roll < 0.18:
+            parts.append(f"`{rng.choice(WORDS)}()`")
+        else:
+            parts.append(rng.choice(WORDS))
+    for _ in range(links):
+        index = rng.randrange(len(parts) + 1)
+        if rng.random() < 0.2:
+            parts.insert(index, f"![{words(rng, 2)}](/images/{rng.choice(WORDS)}.png)")
+        else:
+            parts.insert(index, f"[{words(rng, 2)}](/blog/{rng.choice(WORDS)}-{rng.randrange(1000)})")
+    return " ".join(parts)
+
+
+def generate_block(rng, kind):
+    match kind:
+        case "heading":
+            return "#" * rng.randint(2, 4) + " " + inline_text(rng, rng.randint(2, 6))
+        case "paragraph":
+            lines = [inline_text(rng, rng.randint(8, 20)) for _ in range(rng.randint(1, 4))]
+            return "\n".join(lines)
+        case "link_paragraph":
+            return inline_text(rng, rng.randint(20, 40), links=rng.randint(5, 25))
+        case "unordered_list":
+            return "\n".join("- " + inline_text(rng, rng.randint(3, 10)) for _ in range(rng.randint(2, 8)))
+        case "ordered_list":
+            return "\n".join(f"{i + 1}. " + inline_text(rng, rng.randint(3, 10)) for i in range(rng.randint(2, 8)))
+        case "quote":
+            return "\n".join("> " + inline_text(rng, rng.randint(5, 12)) for _ in range(rng.randint(1, 5)))
+        case "code":
+            lines = [f"{rng.choice(WORDS)} = {rng.choice(WORDS)}({rng.randrange(100)})" for _ in range(rng.randint(2, 12))]
+            return "```\n" + "\n".join(lines) + "\n```"
+        case _:
+            raise ValueError(f'Error: unknown block kind - "{kind}"')
+
+
+def generate_markdown(rng, blocks=30, mix=None):
+    mix = DEFAULT_MIX if mix is None else mix
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    parts = ["# " + words(rng, rng.randint(2, 6)).title()]
+    parts.extend(generate_block(rng, kind) for kind in rng.choices(kinds, weights, k=blocks))
+    return "\n\n".join(parts) + "\n"
+
+
+def generate_corpus(dest_dir, pages=1000, seed=0, blocks=30, mix=None, per_section=50):
+    rng = random.Random(seed)
+    paths = []
+    for i in range(pages):
+        section = os.path.join(dest_dir, f"section{i // per_section:03d}", f"page{i:05d}")
+        os.makedirs(section, exist_ok=True)
+        path = os.path.join(section, "index.md")
+        with open(path, 'w') as f:
+            f.write(generate_markdown(rng, blocks, mix))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic content tree")
+    parser.add_argument("dest_dir")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--blocks", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    paths = generate_corpus(args.dest_dir, args.pages, args.seed, args.blocks)
+    print(f"Wrote {len(paths)} pages to {args.dest_dir}")
+
+
+if __name__ == "__main__":
+    main()
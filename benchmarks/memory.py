@@ -0,0 +1,77 @@
+import gc, json, sys, tracemalloc
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+
+class DictTextNode():
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictLeafNode():
+    def __init__(self, tag, value, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
+
+
+class DictParentNode():
+    def __init__(self, tag, children, props=None):
+        self.tag = tag
+        self.value = None
+        self.children = children
+        self.props = props
+
+
+def text_nodes(text_node_class, count):
+    return [text_node_class("word", TextType.TEXT) for _ in range(count)]
+
+
+def leaf_nodes(leaf_class, count):
+    return [leaf_class("b", "word") for _ in range(count)]
+
+
+def parent_nodes(parent_class, count):
+    children = []
+    return [parent_class("li", children) for _ in range(count)]
+
+
+def bytes_per_node(factory, node_class, count):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = factory(node_class, count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del nodes
+    return (after - before) / count
+
+
+def run(count=100_000):
+    cases = [
+        ("TextNode", text_nodes, DictTextNode, TextNode),
+        ("LeafNode", leaf_nodes, DictLeafNode, LeafNode),
+        ("ParentNode", parent_nodes, DictParentNode, ParentNode),
+    ]
+    results = {}
+    for name, factory, dict_class, slotted_class in cases:
+        dict_bytes = bytes_per_node(factory, dict_class, count)
+        slotted_bytes = bytes_per_node(factory, slotted_class, count)
+        results[name] = {
+            "dict_bytes_per_node": round(dict_bytes, 1),
+            "slotted_bytes_per_node": round(slotted_bytes, 1),
+            "saved_bytes_per_node": round(dict_bytes - slotted_bytes, 1),
+        }
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(json.dumps(run(count), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,2 @@
 python3 src/main.py
-python3 -m http.server 8888 --directory docs
+python3 src/server.py --directory docs --port 8888
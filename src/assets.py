@@ -0,0 +1,66 @@
+import os, json, hashlib
+from manifest import write_text_if_changed
+
+ASSET_MANIFEST_NAME = "asset-manifest.json"
+FINGERPRINT_LENGTH = 8
+
+
+def fingerprint_name(relative_path, digest):
+    directory, filename = os.path.split(relative_path)
+    stem, extension = os.path.splitext(filename)
+    return os.path.join(directory, f"{stem}.{digest[:FINGERPRINT_LENGTH]}{extension}")
+
+
+class AssetMap():
+    """Fingerprinted URLs and intrinsic image sizes of the static files, keyed by their original URL."""
+
+    def __init__(self, urls=None, sizes=None):
+        self.urls = {} if urls is None else dict(sorted(urls.items()))
+        self.sizes = {} if sizes is None else dict(sorted(sizes.items()))
+        self.sizes_digest = hashlib.sha256(json.dumps(list(self.sizes.items())).encode()).hexdigest()
+        self.digest = hashlib.sha256(json.dumps(self.urls).encode() + self.sizes_digest.encode()).hexdigest()
+
+
+    @classmethod
+    def load(cls, path, sizes=None):
+        try:
+            with open(path, 'r') as f:
+                urls = json.load(f)
+        except (OSError, ValueError):
+            urls = None
+        return cls(urls, sizes)
+
+
+    def __eq__(self, other):
+        return isinstance(other, AssetMap) and self.digest == other.digest
+
+
+    def __hash__(self):
+        return hash(self.digest)
+
+
+    def __repr__(self):
+        return f'AssetMap({len(self.urls)} assets, {self.digest[:12]})'
+
+
+    def size(self, url):
+        return self.sizes.get(url.partition("#")[0].partition("?")[0])
+
+
+    def resolve(self, url):
+        path, sep, suffix = url.partition("#")
+        path, query_sep, query = path.partition("?")
+        mapped = self.urls.get(path)
+        if mapped is None:
+            return url
+        return mapped + query_sep + query + sep + suffix
+
+
+    def write(self, path):
+        return write_text_if_changed(path, json.dumps(self.urls, indent=1))
+
+
+def resolve_url(url, base_path, assets=None):
+    if assets is not None:
+        url = assets.resolve(url)
+    return base_path + url[1:]
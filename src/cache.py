@@ -0,0 +1,127 @@
+import os, hashlib
+from collections import OrderedDict
+from functools import lru_cache
+
+CACHE_DIR = ".markdopus/cache"
+# Every module whose code shapes cached HTML: the parser, plus the URL and image visitors
+# in gencontent.py and assets.py whose output is baked into each entry
+PARSER_MODULES = ("htmlnode.py", "textnode.py", "inline_markdown.py", "markdown_blocks.py", "gencontent.py", "assets.py")
+# Stands in for base_path in cached HTML; pages containing it are never cached
+BASE_MARKER = "\x00"
+
+
+@lru_cache(maxsize=None)
+def parser_version():
+    digest = hashlib.sha256()
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in PARSER_MODULES:
+        with open(os.path.join(src_dir, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def content_key(markdown, variant=""):
+    digest = hashlib.sha256()
+    digest.update(parser_version().encode())
+    digest.update(variant.encode())
+    digest.update(b"\x00")
+    digest.update(markdown.encode())
+    return digest.hexdigest()
+
+
+class ContentCache():
+    def __init__(self, directory=CACHE_DIR, max_bytes=256 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+
+    def key(self, markdown, variant=""):
+        return content_key(markdown, variant)
+
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".html")
+
+
+    def get(self, markdown, variant=""):
+        path = self.path(self.key(markdown, variant))
+        try:
+            with open(path, 'r') as f:
+                html = f.read()
+        except OSError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return html
+
+
+    def put(self, markdown, html, variant=""):
+        if BASE_MARKER in markdown:
+            return
+        path = self.path(self.key(markdown, variant))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+
+
+    def evict(self):
+        entries = []
+        total = 0
+        if not os.path.isdir(self.directory):
+            return 0
+        for dirpath, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                stat = os.stat(os.path.join(dirpath, filename))
+                entries.append((stat.st_mtime_ns, stat.st_size, os.path.join(dirpath, filename)))
+                total += stat.st_size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+
+class MemoryCache():
+    def __init__(self, backing=None, max_entries=4096):
+        self.backing = backing
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+
+    def get(self, markdown, variant=""):
+        key = content_key(markdown, variant)
+        html = self.entries.get(key)
+        if html is not None:
+            self.entries.move_to_end(key)
+            return html
+        if self.backing is not None:
+            html = self.backing.get(markdown, variant)
+            if html is not None:
+                self.remember(key, html)
+        return html
+
+
+    def put(self, markdown, html, variant=""):
+        if BASE_MARKER in markdown:
+            return
+        self.remember(content_key(markdown, variant), html)
+        if self.backing is not None:
+            self.backing.put(markdown, html, variant)
+
+
+    def remember(self, key, html):
+        self.entries[key] = html
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+    def evict(self):
+        return 0 if self.backing is None else self.backing.evict()
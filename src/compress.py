@@ -0,0 +1,90 @@
+import os, gzip
+from concurrent.futures import ThreadPoolExecutor
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".svg")
+MIN_SIZE = 1024
+
+
+class CompressStats():
+    def __init__(self):
+        self.compressed = 0
+        self.skipped = 0
+        self.removed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+
+    def ratio(self):
+        return self.bytes_out / self.bytes_in if self.bytes_in else 1.0
+
+
+    def __repr__(self):
+        return (
+            f"Compressed {self.compressed} files ({self.bytes_in} -> {self.bytes_out} bytes, "
+            f"ratio {self.ratio():.2f}), skipped {self.skipped} unchanged, removed {self.removed} stale"
+        )
+
+
+def compress_tree(dest_dir, min_size=MIN_SIZE, workers=None, extensions=COMPRESSIBLE_EXTENSIONS):
+    stats = CompressStats()
+    wanted = []
+    for dirpath, _, filenames in os.walk(dest_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if filename.endswith(".gz"):
+                source_path = path[:-3]
+                if not (source_path.endswith(extensions) and os.path.isfile(source_path)
+                        and os.path.getsize(source_path) >= min_size):
+                    os.remove(path)
+                    stats.removed += 1
+            elif filename.endswith(extensions) and os.path.getsize(path) >= min_size:
+                wanted.append(path)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(compress_file, sorted(wanted)):
+            if result is None:
+                stats.skipped += 1
+                continue
+            stats.compressed += 1
+            stats.bytes_in += result[0]
+            stats.bytes_out += result[1]
+    return stats
+
+
+def remove_gzip_siblings(dest_dir, extensions=COMPRESSIBLE_EXTENSIONS):
+    """Delete the .gz files a --gzip build left behind that no longer match their source; returns how many."""
+    removed = 0
+    for dirpath, _, filenames in os.walk(dest_dir):
+        for filename in filenames:
+            if not filename.endswith(".gz") or not filename[:-3].endswith(extensions):
+                continue
+            path = os.path.join(dirpath, filename)
+            try:
+                fresh = os.stat(path[:-3]).st_mtime_ns == os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                fresh = False
+            if not fresh:
+                os.remove(path)
+                removed += 1
+    return removed
+
+
+def compress_file(path):
+    gz_path = path + ".gz"
+    stat = os.stat(path)
+    try:
+        if os.stat(gz_path).st_mtime_ns == stat.st_mtime_ns:
+            return None
+    except FileNotFoundError:
+        pass
+    with open(path, 'rb') as f:
+        data = f.read()
+    # mtime=0 keeps the output byte-identical between builds
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    tmp_path = f"{gz_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(compressed)
+    # The .gz takes its source's mtime so an unchanged source can be recognised next build
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(tmp_path, gz_path)
+    return len(data), len(compressed)
@@ -0,0 +1,204 @@
+import io, os, sys, copy, json, time, socket, argparse, threading, socketserver
+from contextlib import redirect_stdout, redirect_stderr
+from cache import ContentCache, MemoryCache, CACHE_DIR
+from watch import Rebuilder
+from metadata import PageIndex, INDEX_PATH
+import main as site
+
+SOCKET_PATH = ".markdopus/daemon.sock"
+# Build options whose outputs the Rebuilder does not keep up to date; a render under them is a full build
+FULL_BUILD_OPTIONS = ("fingerprint", "gzip", "search", "site_url", "section_index", "shard")
+
+
+class BuildDaemon():
+    def __init__(self, cache_size=256):
+        self.cache = MemoryCache(ContentCache(CACHE_DIR, cache_size << 20))
+        self.manifest = None
+        self.manifest_mtime_ns = None
+        self.options = None
+        self.builds = 0
+
+
+    def handle(self, request):
+        command = request.get("command")
+        started = time.perf_counter()
+        output = io.StringIO()
+        try:
+            with redirect_stdout(output), redirect_stderr(output):
+                match command:
+                    case "ping":
+                        result = {"builds": self.builds, "pid": os.getpid()}
+                    case "build":
+                        result = self.build(request.get("args", []))
+                    case "render":
+                        result = self.render(request.get("paths", []), request.get("base_path", "/"))
+                    case "shutdown":
+                        result = {}
+                    case _:
+                        raise ValueError(f'Error: unknown command - "{command}"')
+        except SystemExit as e:
+            # main.py's argument parser exits on bad options; that must not take the daemon down with it
+            return {"ok": False, "error": f'Error: "{command}" exited with status {e.code}', "output": output.getvalue()}
+        except Exception as e:
+            return {"ok": False, "error": str(e), "output": output.getvalue()}
+        result.update({"ok": True, "output": output.getvalue(), "elapsed_ms": (time.perf_counter() - started) * 1e3})
+        return result
+
+
+    def current_manifest(self):
+        # Another process may have built since we last did; trust the file over our copy then
+        if self.manifest is not None and self.manifest_mtime_ns != stat_mtime_ns(self.manifest.path):
+            self.manifest = None
+        return self.manifest
+
+
+    def build(self, args):
+        return self.build_with(site.parse_args(args))
+
+
+    def build_with(self, options):
+        self.manifest = site.build(options, self.current_manifest(), self.cache)
+        self.manifest_mtime_ns = stat_mtime_ns(self.manifest.path)
+        self.options = options
+        self.builds += 1
+        return {"pages": len(self.manifest.pages), "assets": len(self.manifest.assets)}
+
+
+    def render(self, paths, base_path):
+        # The last build's options still apply; only the base path comes with the request
+        options = copy.copy(self.options) if self.options is not None else site.parse_args([])
+        options.base_path = base_path
+        options.clean = False
+        if (
+            self.current_manifest() is None or self.manifest.base_path != base_path
+            or any(getattr(options, name) for name in FULL_BUILD_OPTIONS)
+        ):
+            return self.build_with(options)
+        rebuilder = Rebuilder(
+            base_path, site.CONTENT_DIR, site.TEMPLATE_PATH, site.STATIC_DIR, site.DEST_DIR, self.manifest, self.cache,
+            PageIndex.load(INDEX_PATH),
+        )
+        rebuilt = rebuilder.rebuild(paths)
+        self.manifest_mtime_ns = stat_mtime_ns(self.manifest.path)
+        return {"rebuilt": rebuilt}
+
+
+def stat_mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {"ok": False, "error": "Error: request is not valid JSON"}
+                request = {}
+            else:
+                response = self.server.builder.handle(request)
+            self.wfile.write((json.dumps(response) + "\n").encode())
+            if request.get("command") == "shutdown":
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+
+def make_daemon_server(socket_path=SOCKET_PATH, builder=None):
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+    if os.path.exists(socket_path):
+        if is_running(socket_path):
+            raise RuntimeError(f"Error: a daemon is already listening on {socket_path}")
+        os.remove(socket_path)
+    server = socketserver.UnixStreamServer(socket_path, DaemonHandler)
+    server.builder = BuildDaemon() if builder is None else builder
+    return server
+
+
+def send_request(request, socket_path=SOCKET_PATH, timeout=None):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(request) + "\n").encode())
+        with sock.makefile('r') as f:
+            line = f.readline()
+    if not line:
+        return {"ok": False, "error": "Error: the daemon closed the connection without a reply"}
+    return json.loads(line)
+
+
+def is_running(socket_path=SOCKET_PATH):
+    try:
+        return send_request({"command": "ping"}, socket_path, timeout=1)["ok"]
+    except (OSError, ValueError):
+        return False
+
+
+def request_or_build(request, socket_path=SOCKET_PATH):
+    try:
+        return send_request(request, socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        pass
+    if request["command"] == "render":
+        request = {"command": "build", "args": [request.get("base_path", "/")]}
+    if request["command"] != "build":
+        return {"ok": False, "error": "Error: no daemon is running"}
+    print("No build daemon running, building in-process")
+    site.main(request["args"])
+    return {"ok": True, "output": ""}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep a warm build process and send it build requests")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("start", help="run the daemon in the foreground")
+    commands.add_parser("stop", help="ask a running daemon to exit")
+    commands.add_parser("status", help="report whether a daemon is running")
+    commands.add_parser(
+        "build", help="build the site, in the daemon when one is running; other arguments are passed to src/main.py",
+    )
+    render = commands.add_parser("render", help="rebuild only the outputs of the given changed files")
+    render.add_argument("paths", nargs="+")
+    render.add_argument("--base-path", default="/")
+    # Unknown options belong to src/main.py, so "build --clean -j 2" needs no "--" in front
+    args, build_args = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    if build_args and args.command != "build":
+        parser.error(f"unrecognized arguments: {' '.join(build_args)}")
+    if build_args[:1] == ["--"]:
+        build_args = build_args[1:]
+
+    match args.command:
+        case "start":
+            server = make_daemon_server(args.socket)
+            print(f"Build daemon listening on {args.socket}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+                os.remove(args.socket)
+            return
+        case "status":
+            print("running" if is_running(args.socket) else "not running")
+            return
+        case "stop":
+            response = request_or_build({"command": "shutdown"}, args.socket)
+        case "build":
+            response = request_or_build({"command": "build", "args": build_args}, args.socket)
+        case "render":
+            response = request_or_build({"command": "render", "paths": args.paths, "base_path": args.base_path}, args.socket)
+    if response.get("output"):
+        print(response["output"], end="")
+    if not response["ok"]:
+        print(response["error"])
+        sys.exit(1)
+    if "elapsed_ms" in response:
+        print(f"Done in {response['elapsed_ms']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,287 @@
-import os
-from markdown_blocks import markdown_to_html_node
+import io, os, re, hashlib
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from markdown_blocks import markdown_to_blocks, blocks_to_html_node, MarkdownStream
+from manifest import hash_file
+from template import load_template
+from profiling import Profiler, optional_stage
+from cache import BASE_MARKER, MemoryCache, parser_version
+from assets import resolve_url
+from metadata import split_front_matter, read_front_matter, page_slots, listing_node, page_url
+from search import content_terms
+from htmlnode import transform
+
+# Pages at least this large are rendered block by block without loading the whole file
+STREAM_THRESHOLD = 32 << 20
+# A cached root URL runs from BASE_MARKER up to the closing quote of its attribute
+MARKED_URL_PATTERN = re.compile(BASE_MARKER + r'([^"]*)')
+
 
 def extract_title(markdown):
-    lines = markdown.split("\n")
+    return find_title(io.StringIO(markdown))
+
+
+def find_title(lines):
     for line in lines:
         if line.startswith("# "):
-            return line[1:].strip(" ")
+            return line[1:].rstrip("\n").strip(" ")
     raise Exception("No title found")
 
 
-def generate_page(base_path, from_path, template_path, dest_path):
+def generate_page(
+    base_path, from_path, template_path, dest_path, profile=False, cache=None, assets=None, slots=None, search=False,
+):
+    """Returns (profile events or None, search terms or None)."""
+    if os.path.getsize(from_path) >= STREAM_THRESHOLD:
+        return stream_page(base_path, from_path, template_path, dest_path, profile, assets, slots, search)
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    with open(from_path, 'r') as f:
-        markdown = f.read()
-    title = extract_title(markdown)
-    content = markdown_to_html_node(markdown).to_html()
-    with open(template_path, 'r') as f:
-        template = f.read()
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", content)
-    template = template.replace('href="/', f'href="{base_path}')
-    template = template.replace('src="/', f'src="{base_path}')
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, 'w') as f:
-        f.write(template)
-
-
-def generate_pages_recursive(base_path, content_dir_path, template_path, dest_dir_path):
-    for content in os.listdir(content_dir_path):
+    profiler = Profiler() if profile else None
+    with optional_stage(profiler, "read", from_path):
+        with open(from_path, 'r') as f:
+            fields, markdown = split_front_matter(f.read())
+        title = fields.get("title") or extract_title(markdown)
+    content = render_content(markdown, base_path, cache, assets, profiler, from_path)
+    with optional_stage(profiler, "template", from_path):
+        template = load_template(template_path, base_path, assets)
+    with optional_stage(profiler, "write", from_path):
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, 'w') as f:
+            template.write_to(f, **template_values(slots, fields, title, content))
+    return None if profiler is None else profiler.events, content_terms(content) if search else None
+
+
+def template_values(slots, fields, title, content):
+    values = dict(slots or ())
+    values.update(page_slots(fields))
+    values["Title"] = title
+    values["Content"] = content
+    return values
+
+
+def stream_page(base_path, from_path, template_path, dest_path, profile=False, assets=None, slots=None, search=False):
+    print(f"Streaming page from {from_path} to {dest_path} using {template_path}")
+    profiler = Profiler()
+    with profiler.stage("stream", from_path):
+        with open(from_path, 'r') as f:
+            fields = read_front_matter(f)
+            title = fields.get("title") or find_title(f)
+        template = load_template(template_path, base_path, assets)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        # One set of visitors for the whole page so only its first image is loaded eagerly
+        visitors = content_visitors(base_path, assets)
+        terms = set() if search else None
+
+        def transform_block(node):
+            transform(node, *visitors)
+            if search:
+                terms.update(content_terms(node))
+
+        with open(from_path, 'r') as f, open(dest_path, 'w') as out:
+            read_front_matter(f)
+            content = MarkdownStream(f, transform_block)
+            template.write_to(out, **template_values(slots, fields, title, content))
+    return profiler.events if profile else None, sorted(terms) if search else None
+
+
+def render_content(markdown, base_path, cache=None, assets=None, profiler=None, page=None):
+    if cache is None or BASE_MARKER in markdown:
+        content = parse_content(markdown, base_path, assets, False, profiler, page)
+        if profiler is None:
+            return content
+        # Timed on its own here; otherwise the template serializes the tree as it writes it
+        with profiler.stage("serialize", page):
+            return content.to_html()
+    # Cached HTML keeps BASE_MARKER in place of the leading "/" so a base_path or fingerprint change still hits
+    variant = cache_variant(assets)
+    with optional_stage(profiler, "cache_read", page):
+        html = cache.get(markdown, variant)
+    if html is None:
+        content = parse_content(markdown, BASE_MARKER, assets, True, profiler, page)
+        with optional_stage(profiler, "serialize", page):
+            html = content.to_html()
+        with optional_stage(profiler, "cache_write", page):
+            cache.put(markdown, html, variant)
+    return resolve_marked_urls(html, base_path, assets)
+
+
+def parse_content(markdown, base_path, assets=None, cached=False, profiler=None, page=None):
+    with optional_stage(profiler, "block_split", page):
+        blocks = markdown_to_blocks(markdown)
+    with optional_stage(profiler, "inline_parse", page):
+        return transform(blocks_to_html_node(blocks), *content_visitors(base_path, assets, cached))
+
+
+def resolve_marked_urls(html, base_path, assets=None):
+    if assets is None:
+        return html.replace(BASE_MARKER, base_path)
+    return MARKED_URL_PATTERN.sub(lambda match: resolve_url("/" + match.group(1), base_path, assets), html)
+
+
+def content_visitors(base_path, assets=None, cached=False):
+    """The transforms applied to rendered content, fused into one pass by transform()."""
+    visitors = [] if assets is None else [image_annotator(assets)]
+    # Cached HTML resolves fingerprinted URLs on the way out, after the BASE_MARKER
+    visitors.append(url_rewriter(base_path, None if cached else assets))
+    return visitors
+
+
+def url_rewriter(base_path, assets=None):
+    def rewrite(node):
+        if node.props:
+            for name in ("href", "src"):
+                url = node.props.get(name)
+                if url is not None and url.startswith("/"):
+                    node.props[name] = resolve_url(url, base_path, assets)
+    return rewrite
+
+
+def rewrite_root_urls(node, base_path, assets=None):
+    transform(node, url_rewriter(base_path, assets))
+
+
+def image_annotator(assets):
+    """Give images their intrinsic size and lazy-load all but the first one the visitor sees."""
+    images = 0
+
+    def annotate(node):
+        nonlocal images
+        if node.tag == "img":
+            size = assets.size(node.props.get("src", ""))
+            if size is not None:
+                node.props["width"] = str(size[0])
+                node.props["height"] = str(size[1])
+            if images:
+                node.props["loading"] = "lazy"
+                node.props["decoding"] = "async"
+            images += 1
+    return annotate
+
+
+def cache_variant(assets):
+    # Image sizes are baked into cached HTML, fingerprinted URLs are not
+    return "" if assets is None else assets.sizes_digest
+
+
+def update_search(search, pages, terms, dest_dir_path, base_path, index=None):
+    if search is None:
+        return
+    titles = {} if index is None else {page["url"]: page["title"] for page in index.listing()}
+    search.update(
+        {page_url(dest_path, dest_dir_path): page_terms for dest_path, page_terms in terms.items()},
+        [page_url(dest_path, dest_dir_path) for _, dest_path in pages],
+        titles,
+    )
+    written = search.write(dest_dir_path, base_path)
+    search.save()
+    print(f"Search index: {len(terms)} pages tokenized, {written} files written")
+
+
+def listing_html(pages, base_path, assets=None):
+    node = listing_node(pages)
+    rewrite_root_urls(node, base_path, assets)
+    return node.to_html()
+
+
+def dest_path_for(content_path, content_dir_path, dest_dir_path):
+    relative_path = os.path.relpath(content_path, content_dir_path)
+    return os.path.join(dest_dir_path, relative_path[:-3] + ".html")
+
+
+def find_pages(content_dir_path, dest_dir_path):
+    pages = []
+    for content in sorted(os.listdir(content_dir_path)):
         content_path = os.path.join(content_dir_path, content)
         dest_path = os.path.join(dest_dir_path, content)
         if os.path.isfile(content_path) and content_path.endswith(".md"):
-            generate_page(base_path, content_path, template_path, dest_path.replace(".md", ".html"))
+            pages.append((content_path, dest_path[:-3] + ".html"))
         if os.path.isdir(content_path):
-            generate_pages_recursive(base_path, content_path, template_path, dest_path)
+            pages.extend(find_pages(content_path, dest_path))
+    return pages
+
+
+def shard_of(relative_path, count):
+    # Hash the "/"-separated path so a page lands in the same shard on every machine
+    digest = hashlib.sha256(relative_path.replace(os.sep, "/").encode()).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def select_shard(pages, content_dir_path, shard):
+    index, count = shard
+    return [
+        (content_path, dest_path) for content_path, dest_path in pages
+        if shard_of(os.path.relpath(content_path, content_dir_path), count) == index
+    ]
+
+
+def generate_pages(
+    base_path, pages, template_path, jobs=1, profiler=None, cache=None, assets=None, slots=None, search=False,
+):
+    """Render the pages; returns {dest_path: search terms} when search is set."""
+    if jobs <= 1 or len(pages) < 2:
+        render = partial(generate_page_task, base_path, template_path, profiler is not None, cache, assets, slots, search)
+        return collect_results(pages, map(render, pages), profiler)
+
+    # A MemoryCache would be pickled into every chunk and the workers' puts lost; they share the disk cache
+    if isinstance(cache, MemoryCache):
+        cache = cache.backing
+    render = partial(generate_page_task, base_path, template_path, profiler is not None, cache, assets, slots, search)
+    chunksize = max(1, len(pages) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return collect_results(pages, executor.map(render, pages, chunksize=chunksize), profiler)
+
+
+def collect_results(pages, results, profiler):
+    terms = {}
+    for (_, dest_path), (events, page_terms) in zip(pages, results):
+        if profiler:
+            profiler.add(events)
+        if page_terms is not None:
+            terms[dest_path] = page_terms
+    return terms
+
+
+def generate_page_task(base_path, template_path, profile, cache, assets, slots, search, page):
+    content_path, dest_path = page
+    return generate_page(base_path, content_path, template_path, dest_path, profile, cache, assets, slots, search)
+
+
+def generate_pages_recursive(
+    base_path, content_dir_path, template_path, dest_dir_path, manifest=None, jobs=1, profiler=None, cache=None,
+    assets=None, shard=None, index=None, search=None,
+):
+    pages = find_pages(content_dir_path, dest_dir_path)
+    slots = None
+    listing = None
+    if index is not None:
+        index.update(pages, dest_dir_path).save()
+        # Only a template with a {{ Pages }} slot makes every page depend on the whole index
+        if "Pages" in load_template(template_path, base_path, assets).slot_names():
+            slots = {"Pages": listing_html(index.listing(), base_path, assets)}
+            listing = index.digest()
+    if shard is not None:
+        pages = select_shard(pages, content_dir_path, shard)
+    if manifest is None:
+        terms = generate_pages(base_path, pages, template_path, jobs, profiler, cache, assets, slots, search is not None)
+        update_search(search, pages, terms, dest_dir_path, base_path, index)
+        return [dest_path for _, dest_path in pages]
+
+    manifest.set_inputs(
+        hash_file(template_path), base_path, None if assets is None else assets.digest, listing, parser_version(),
+    )
+    stale = []
+    for content_path, dest_path in pages:
+        fresh, source_hash = manifest.check(content_path, dest_path)
+        if not fresh or (search is not None and not search.has(page_url(dest_path, dest_dir_path))):
+            stale.append((content_path, dest_path, source_hash))
+    terms = generate_pages(
+        base_path, [(content_path, dest_path) for content_path, dest_path, _ in stale], template_path, jobs, profiler,
+        cache, assets, slots, search is not None,
+    )
+    update_search(search, pages, terms, dest_dir_path, base_path, index)
+    for content_path, dest_path, source_hash in stale:
+        manifest.record(content_path, dest_path, source_hash)
+    for dest_path in manifest.prune(dest_path for _, dest_path in pages):
+        print(f"Removed stale page {dest_path}")
+    manifest.save()
+    print(f"Generated {len(stale)} pages, {len(pages) - len(stale)} up to date")
+    return [dest_path for _, dest_path, _ in stale]
@@ -1,28 +1,110 @@
 
+import sys
+
+ENTER = "enter"
+EXIT = "exit"
+
+
+def walk_events(root):
+    """Yield (ENTER, node) before and (EXIT, node) after each node's subtree, without recursing."""
+    stack = [(ENTER, root)]
+    pop, push = stack.pop, stack.append
+    while stack:
+        event, node = pop()
+        yield event, node
+        if event is ENTER:
+            push((EXIT, node))
+            # The consumer sees ENTER before the children are read, so it can reject the node first
+            children = node.children
+            if children:
+                stack.extend((ENTER, child) for child in reversed(children))
+
+
+def walk(root):
+    """Nodes in pre-order: each node before its children."""
+    return (node for event, node in walk_events(root) if event is ENTER)
+
+
+def walk_post(root):
+    """Nodes in post-order: each node after its children."""
+    return (node for event, node in walk_events(root) if event is EXIT)
+
+
+def transform(root, *visitors):
+    """Run all visitors over the tree in one pre-order pass and return the (possibly replaced) root.
+
+    Each visitor is called with every node and may change it in place; a visitor that returns a node
+    replaces the visited one, and later visitors and the walk continue from the replacement.
+    """
+    stack = [(None, 0, root)]
+    while stack:
+        siblings, position, node = stack.pop()
+        for visitor in visitors:
+            replacement = visitor(node)
+            if replacement is not None:
+                node = replacement
+        if siblings is None:
+            root = node
+        elif siblings[position] is not node:
+            siblings[position] = node
+        children = node.children
+        if children:
+            stack.extend((children, position, children[position]) for position in reversed(range(len(children))))
+    return root
+
 
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        self.tag = tag if tag is None else sys.intern(tag)
         self.value = value
         self.children = children
-        self.props = props
+        # None is the shared "no props" value; empty dicts are not kept per node
+        self.props = props or None
 
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+
+    def iter_html(self):
         raise NotImplementedError()
 
 
+    def write_to(self, sink):
+        write = sink.write
+        for chunk in self.iter_html():
+            write(chunk)
+
+
     def props_to_html(self):
         return "" if self.props is None else " " + " ".join(f'{k}="{v}"' for k, v in self.props.items())
 
 
     def __eq__(self, other):
-        return (
-            self.tag == other.tag and
-            self.value == other.value and
-            self.children == other.children and
-            self.props == other.props
-        )
+        if not isinstance(other, HTMLNode):
+            return NotImplemented
+        # Compared pairwise off a stack so deeply nested trees never hit the recursion limit
+        stack = [(self, other)]
+        while stack:
+            left, right = stack.pop()
+            if left is right:
+                continue
+            if not isinstance(right, HTMLNode) or not isinstance(left, HTMLNode):
+                if left != right:
+                    return False
+                continue
+            if left.tag != right.tag or left.value != right.value or left.props != right.props:
+                return False
+            if left.children is None or right.children is None:
+                if left.children is not right.children:
+                    return False
+                continue
+            if len(left.children) != len(right.children):
+                return False
+            stack.extend(zip(left.children, right.children))
+        return True
 
 
     def __repr__(self):
@@ -30,11 +112,17 @@ class HTMLNode():
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
 
-    def to_html(self):
+    def iter_html(self):
+        yield self.leaf_html()
+
+
+    def leaf_html(self):
         if self.value is None:
             raise ValueError("Error: LeafNode must have a value")
 
@@ -49,19 +137,32 @@ class LeafNode(HTMLNode):
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
 
-    def to_html(self):
-        if self.tag is None:
-            raise ValueError("Error: ParentNode must have a tag")
-
-        if self.children is None:
-            raise ValueError("Error: ParentNode must have children")
-
-        inner = "".join(child.to_html() for child in self.children)
-        return f'<{self.tag}{self.props_to_html()}>{inner}</{self.tag}>'
+    def iter_html(self):
+        # The walk_events traversal, inlined: closing tags wait on the stack as plain strings
+        stack = [self]
+        pop, push = stack.pop, stack.append
+        while stack:
+            node = pop()
+            if node.__class__ is str:
+                yield node
+            elif isinstance(node, ParentNode):
+                if node.tag is None:
+                    raise ValueError("Error: ParentNode must have a tag")
+                if node.children is None:
+                    raise ValueError("Error: ParentNode must have children")
+                yield f'<{node.tag}{node.props_to_html()}>'
+                push(f'</{node.tag}>')
+                stack.extend(reversed(node.children))
+            elif isinstance(node, LeafNode):
+                yield node.leaf_html()
+            else:
+                yield from node.iter_html()
 
 
     def __repr__(self):
@@ -0,0 +1,82 @@
+import os, struct
+from functools import lru_cache
+from staticsync import walk_files, url_for
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+# JPEG start-of-frame markers; C4, C8 and CC share the range but are not frames
+JPEG_FRAME_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def image_size(path):
+    stat = os.stat(path)
+    return read_image_size(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=4096)
+def read_image_size(path, mtime_ns, size):
+    with open(path, 'rb') as f:
+        try:
+            return parse_image_size(f)
+        except struct.error:
+            return None
+
+
+def parse_image_size(f):
+    head = f.read(30)
+    if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+        return struct.unpack(">II", head[16:24])
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return struct.unpack("<HH", head[6:10])
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return parse_webp_size(head)
+    if head[:2] == b"\xff\xd8":
+        f.seek(2)
+        return parse_jpeg_size(f)
+    return None
+
+
+def parse_webp_size(head):
+    match head[12:16]:
+        case b"VP8 ":
+            width, height = struct.unpack("<HH", head[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        case b"VP8L":
+            bits = struct.unpack("<I", head[21:25])[0]
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        case b"VP8X":
+            width = int.from_bytes(head[24:27], "little") + 1
+            height = int.from_bytes(head[27:30], "little") + 1
+            return width, height
+    return None
+
+
+def parse_jpeg_size(f):
+    # Walk the segment headers, seeking over their bodies, until the frame header
+    while True:
+        byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker == 0xD9 or marker == 0xDA:
+            return None
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            continue
+        length = struct.unpack(">H", f.read(2))[0]
+        if marker in JPEG_FRAME_MARKERS:
+            height, width = struct.unpack(">xHH", f.read(5))
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def image_sizes(static_dir):
+    sizes = {}
+    if not os.path.isdir(static_dir):
+        return sizes
+    for source_path, relative_path in walk_files(static_dir):
+        if relative_path.lower().endswith(IMAGE_EXTENSIONS):
+            size = image_size(source_path)
+            if size is not None:
+                sizes[url_for(relative_path)] = tuple(size)
+    return sizes
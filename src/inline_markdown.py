@@ -2,16 +2,119 @@ import re
 from textnode import TextType, TextNode
 
 
+PAREN_PATTERN = re.compile(r"[()]")
+DELIMITER_PATTERN = re.compile(r"\*\*|_|`")
+MARKUP_PATTERN = re.compile(r"\*\*|[_`\[]")
+
+
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    # One left-to-right scan that yields the same nodes as splitting on
+    # "**", "_" and "`" in turn and then extracting images and links.
+    if not MARKUP_PATTERN.search(text):
+        return [TextNode(text, TextType.TEXT)] if text else []
+
+    nodes = []
+    bold = italic = code = False
+    start = 0
+    for match in DELIMITER_PATTERN.finditer(text):
+        delimiter = match.group()
+        if delimiter == "**":
+            if bold:
+                append_formatted(nodes, text[start:match.start()], TextType.BOLD)
+            elif italic or code:
+                raise ValueError("Error: Invalid markdown: formatted section not closed")
+            else:
+                append_plain(nodes, text, start, match.start())
+            bold = not bold
+        elif bold:
+            continue
+        elif delimiter == "_":
+            if code:
+                raise ValueError("Error: Invalid markdown: formatted section not closed")
+            if italic:
+                append_formatted(nodes, text[start:match.start()], TextType.ITALIC)
+            else:
+                append_plain(nodes, text, start, match.start())
+            italic = not italic
+        elif italic:
+            continue
+        else:
+            if code:
+                append_formatted(nodes, text[start:match.start()], TextType.CODE)
+            else:
+                append_plain(nodes, text, start, match.start())
+            code = not code
+        start = match.end()
+
+    if bold or italic or code:
+        raise ValueError("Error: Invalid markdown: formatted section not closed")
+    append_plain(nodes, text, start, len(text))
     return nodes
 
 
+def append_formatted(nodes, text, text_type):
+    if text:
+        nodes.append(TextNode(text, text_type))
+
+
+def append_plain(nodes, text, start, end):
+    if start == end:
+        return
+    if text.find("[", start, end) == -1:
+        nodes.append(TextNode(text[start:end], TextType.TEXT))
+        return
+    for image_start, image_end, alt, url in iter_bracketed(text, True, start, end):
+        append_links(nodes, text, start, image_start)
+        nodes.append(TextNode(alt, TextType.IMAGE, url))
+        start = image_end
+    append_links(nodes, text, start, end)
+
+
+def append_links(nodes, text, start, end):
+    for link_start, link_end, label, url in iter_bracketed(text, False, start, end):
+        if link_start > start:
+            nodes.append(TextNode(text[start:link_start], TextType.TEXT))
+        nodes.append(TextNode(label, TextType.LINK, url))
+        start = link_end
+    if end > start:
+        nodes.append(TextNode(text[start:end], TextType.TEXT))
+
+
+def iter_bracketed(text, image, start=0, end=None):
+    """Yield (start, end, label, url) of each ![label](url), or [label](url) not preceded by "!", in text[start:end].
+
+    A label runs to the first "]" after its "[", so every "[" before one "]" shares that "]" and the
+    whole run is settled at once; an unclosed "[" is never rescanned to the end of the text.
+    """
+    end = len(text) if end is None else end
+    pos = start
+    while True:
+        first = text.find("[", pos, end)
+        if first == -1:
+            return
+        close = text.find("]", first + 1, end)
+        if close == -1:
+            return
+        paren = PAREN_PATTERN.search(text, close + 2, end) if text.startswith("(", close + 1, end) else None
+        if paren is not None and paren.group() == ")":
+            opening = find_opening(text, image, pos, first, close)
+            if opening != -1:
+                yield opening, paren.end(), text[opening + (2 if image else 1):close], text[close + 2:paren.start()]
+                pos = paren.end()
+                continue
+        pos = close + 1
+
+
+def find_opening(text, image, pos, first, close):
+    # The leftmost "[" in text[first:close] that can open the label; for an image, the "!" before it
+    if image:
+        return text.find("![", max(pos, first - 1), close)
+    opening = first
+    while opening != -1 and opening > 0 and text[opening - 1] == "!":
+        opening = text.find("[", opening + 1, close)
+    return opening
+
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
     for node in old_nodes:
@@ -35,59 +138,36 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
 
 def extract_markdown_images(text):
-    pattern = r"!\[([^]]*)\]\(([^()]*)\)"
-    return re.findall(pattern, text)
+    return [(alt, url) for _, _, alt, url in iter_bracketed(text, True)]
 
 
 def split_nodes_image(old_nodes):
-    new_nodes = []
-    for node in old_nodes:
-        if node.text_type != TextType.TEXT:
-            new_nodes.append(node)
-            continue
-        remaining_text = node.text
-        matches = extract_markdown_images(node.text)
-        if not matches:
-            new_nodes.append(node)
-            continue
-        for match in matches:
-            image_alt, image_link = match
-            sections = remaining_text.split(f"![{image_alt}]({image_link})", 1)
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(TextNode(image_alt, TextType.IMAGE, image_link))
-            remaining_text = sections[1]
-        if remaining_text != "":
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
-    return new_nodes
+    return split_nodes_bracketed(old_nodes, TextType.IMAGE)
 
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^]]*)\]\(([^()]*)\)"
-    return re.findall(pattern, text)
+    return [(label, url) for _, _, label, url in iter_bracketed(text, False)]
 
 
 def split_nodes_link(old_nodes):
+    return split_nodes_bracketed(old_nodes, TextType.LINK)
+
+
+def split_nodes_bracketed(old_nodes, text_type):
     new_nodes = []
     for node in old_nodes:
         if node.text_type != TextType.TEXT:
             new_nodes.append(node)
             continue
-        remaining_text = node.text
-        matches = extract_markdown_links(node.text)
-        if not matches:
+        text = node.text
+        start = 0
+        for match_start, match_end, label, url in iter_bracketed(text, text_type == TextType.IMAGE):
+            if match_start > start:
+                new_nodes.append(TextNode(text[start:match_start], TextType.TEXT))
+            new_nodes.append(TextNode(label, text_type, url))
+            start = match_end
+        if start == 0:
             new_nodes.append(node)
-            continue
-        for match in matches:
-            text, url = match
-            sections = remaining_text.split(f"[{text}]({url})", 1)
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(TextNode(text, TextType.LINK, url))
-            remaining_text = sections[1]
-        if remaining_text != "":
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
+        elif start < len(text):
+            new_nodes.append(TextNode(text[start:], TextType.TEXT))
     return new_nodes
-
-
-
@@ -0,0 +1,114 @@
+import os
+from xml.sax.saxutils import escape
+from gencontent import listing_html
+from manifest import write_text_if_changed, remove_empty_dirs
+from template import load_template
+
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "feed.xml"
+FEED_LIMIT = 20
+
+
+def absolute_url(site_url, base_path, url):
+    return site_url.rstrip("/") + base_path + url[1:]
+
+
+def atom_date(date):
+    return date + "T00:00:00Z" if len(date) == 10 else date
+
+
+def sitemap_xml(pages, site_url, base_path):
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for page in sorted(pages, key=lambda page: page["url"]):
+        lastmod = f"<lastmod>{escape(page['date'])}</lastmod>" if page["date"] else ""
+        lines.append(f"  <url><loc>{escape(absolute_url(site_url, base_path, page['url']))}</loc>{lastmod}</url>")
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+
+def atom_feed(pages, site_url, base_path, title):
+    # Only dated pages are entries; the feed's own date is its newest entry's so an unchanged site keeps the same bytes
+    entries = [page for page in pages if page["date"]][:FEED_LIMIT]
+    if not entries:
+        return None
+    home = absolute_url(site_url, base_path, "/")
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{escape(title)}</title>",
+        f"  <id>{escape(home)}</id>",
+        f'  <link href="{escape(home)}"/>',
+        f'  <link rel="self" href="{escape(absolute_url(site_url, base_path, "/" + FEED_NAME))}"/>',
+        f"  <updated>{escape(atom_date(entries[0]['date']))}</updated>",
+    ]
+    for page in entries:
+        url = escape(absolute_url(site_url, base_path, page["url"]))
+        lines.append("  <entry>")
+        lines.append(f"    <title>{escape(page['title'] or page['url'])}</title>")
+        lines.append(f'    <link href="{url}"/>')
+        lines.append(f"    <id>{url}</id>")
+        lines.append(f"    <updated>{escape(atom_date(page['date']))}</updated>")
+        if page["fields"].get("description"):
+            lines.append(f"    <summary>{escape(page['fields']['description'])}</summary>")
+        lines.append("  </entry>")
+    lines.append("</feed>")
+    return "\n".join(lines) + "\n"
+
+
+def parent_url(url):
+    return url.rstrip("/").rsplit("/", 1)[0] + "/"
+
+
+def find_sections(pages):
+    """{section URL: its pages} for every directory URL that has pages below it but no page of its own."""
+    urls = {page["url"] for page in pages}
+    sections = {}
+    for page in pages:
+        if page["url"] == "/":
+            continue
+        section = parent_url(page["url"])
+        if section not in urls:
+            sections.setdefault(section, []).append(page)
+    return sections
+
+
+def section_title(section_url):
+    return section_url.strip("/").rsplit("/", 1)[-1].replace("-", " ").replace("_", " ").title()
+
+
+def write_listings(
+    index, dest_dir_path, template_path, base_path, manifest, site_url=None, sections=False, assets=None,
+):
+    """Write the sitemap, feed and section pages that changed; returns the number of files written."""
+    pages = index.listing()
+    files = {}
+    if site_url:
+        home = next((page for page in pages if page["url"] == "/"), None)
+        title = home["title"] if home and home["title"] else site_url
+        section_pages = [{"url": url, "date": None} for url in find_sections(pages)] if sections else []
+        files[SITEMAP_NAME] = sitemap_xml(pages + section_pages, site_url, base_path)
+        feed = atom_feed(pages, site_url, base_path, title)
+        if feed is not None:
+            files[FEED_NAME] = feed
+    if sections:
+        template = load_template(template_path, base_path, assets)
+        slots = {}
+        if "Pages" in template.slot_names():
+            slots["Pages"] = listing_html(pages, base_path, assets)
+        for url, section in find_sections(pages).items():
+            html = template.render(**slots, Title=section_title(url), Content=listing_html(section, base_path, assets))
+            files[url[1:] + "index.html"] = html
+
+    written = 0
+    for name, text in sorted(files.items()):
+        written += write_text_if_changed(os.path.join(dest_dir_path, name), text)
+    for name in sorted(set(manifest.generated) - set(files)):
+        path = os.path.join(dest_dir_path, name)
+        # A section that gained its own index.md is now a page and stays
+        if name not in manifest.pages and os.path.isfile(path):
+            os.remove(path)
+            remove_empty_dirs(os.path.dirname(path), dest_dir_path)
+            written += 1
+    manifest.generated = sorted(files)
+    manifest.save()
+    return written
@@ -1,27 +1,151 @@
-import sys, os, shutil
+import sys, os, shutil, argparse
 from textnode import TextType, TextNode
 from gencontent import generate_pages_recursive
+from manifest import BuildManifest, MANIFEST_PATH, LEGACY_MANIFEST_NAME, shard_manifest_name
+from staticsync import sync_static, COPY_MODES
+from profiling import Profiler, optional_stage, format_summary
+from cache import ContentCache, CACHE_DIR
+from compress import compress_tree, remove_gzip_siblings, MIN_SIZE
+from assets import AssetMap, ASSET_MANIFEST_NAME
+from imagesize import image_sizes
+from metadata import PageIndex, INDEX_PATH
+from search import SearchIndex, SEARCH_STATE_PATH, remove_search_index
+from listings import write_listings
 
-def main():
-    source = "./static"
-    destination = "./docs"
-    base_path = sys.argv[1] if len(sys.argv) > 1 else "/"
-    if os.path.exists(destination):
+STATIC_DIR = "./static"
+DEST_DIR = "./docs"
+CONTENT_DIR = "content/"
+TEMPLATE_PATH = "template.html"
+
+def main(argv=None):
+    build(parse_args(sys.argv[1:] if argv is None else argv))
+
+def build(args, manifest=None, cache=None):
+    source = STATIC_DIR
+    destination = DEST_DIR
+    if args.clean and os.path.exists(destination):
         shutil.rmtree(destination)
-    os.mkdir(destination)
-    copy_dir_contents(source, destination)
-    generate_pages_recursive(base_path, "content/", "template.html", destination)
-
-def copy_dir_contents(source, destination):
-    contents = os.listdir(source)
-    for content in os.listdir(source):
-        content_source = os.path.join(source, content)
-        content_destination = os.path.join(destination, content)
-        if os.path.isfile(content_source):
-            shutil.copy(content_source, content_destination)
-        if os.path.isdir(content_source):
-            os.mkdir(content_destination)
-            copy_dir_contents(content_source, content_destination)
+    os.makedirs(destination, exist_ok=True)
+    profiler = Profiler() if args.profile else None
+    # A shard's manifest travels with its outputs until shard.py merges it into MANIFEST_PATH
+    if args.shard is None:
+        manifest_path = MANIFEST_PATH
+    else:
+        manifest_path = os.path.join(destination, shard_manifest_name(args.shard))
+    if args.clean:
+        manifest = BuildManifest(manifest_path, root=destination)
+    elif manifest is None or manifest.path != manifest_path:
+        manifest = BuildManifest.load(manifest_path, destination)
+    remove_legacy_manifest(destination)
+    with optional_stage(profiler, "static_copy"):
+        stats = sync_static(source, destination, manifest, args.checksum, args.copy_mode, args.fingerprint)
+    print(f"Static assets: {stats}")
+    assets = AssetMap(stats.urls, image_sizes(source))
+    if args.fingerprint:
+        write_asset_manifest(destination, assets)
+    else:
+        remove_asset_manifest(destination)
+    if args.search:
+        search = SearchIndex.load(SEARCH_STATE_PATH)
+    else:
+        search = None
+        remove_search_index(destination)
+    if cache is None and not args.no_cache:
+        cache = ContentCache(CACHE_DIR, args.cache_size << 20)
+    index = PageIndex.load(INDEX_PATH)
+    generate_pages_recursive(
+        args.base_path, CONTENT_DIR, TEMPLATE_PATH, destination, manifest, args.jobs, profiler, cache, assets, args.shard,
+        index, search,
+    )
+    with optional_stage(profiler, "listings"):
+        written = write_listings(
+            index, destination, TEMPLATE_PATH, args.base_path, manifest, args.site_url, args.section_index, assets,
+        )
+    if written:
+        print(f"Listings: wrote {written} changed files")
+    if cache:
+        cache.evict()
+    if args.gzip:
+        with optional_stage(profiler, "compress"):
+            stats = compress_tree(destination, args.gzip_min_size)
+        print(f"Gzip: {stats}")
+    else:
+        # Pages changed by this build would otherwise keep serving the old content from their .gz
+        removed = remove_gzip_siblings(destination)
+        if removed:
+            print(f"Gzip: removed {removed} stale .gz files")
+    if profiler:
+        report = profiler.write(args.profile + ".json", args.profile + ".trace.json", args.top)
+        print(format_summary(report))
+    return manifest
+
+def remove_legacy_manifest(destination):
+    path = os.path.join(destination, LEGACY_MANIFEST_NAME)
+    if os.path.isfile(path):
+        os.remove(path)
+        print(f"Removed {path}; build state is now kept in {MANIFEST_PATH}")
+
+def write_asset_manifest(destination, assets):
+    if assets.write(os.path.join(destination, ASSET_MANIFEST_NAME)):
+        print(f"Wrote asset manifest with {len(assets.urls)} fingerprinted files")
+
+def remove_asset_manifest(destination):
+    path = os.path.join(destination, ASSET_MANIFEST_NAME)
+    if os.path.isfile(path):
+        os.remove(path)
+
+def parse_shard(value):
+    index, _, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected I/N, got "{value}"')
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f'shard {index} is not between 1 and {count}')
+    return index, count
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generate the static site into docs/")
+    parser.add_argument("base_path", nargs="?", default="/")
+    parser.add_argument("--clean", action="store_true", help="delete docs/ and rebuild every page")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="render pages in N worker processes (0 = one per CPU)")
+    parser.add_argument("--checksum", action="store_true", help="compare static files by hash instead of size and mtime")
+    parser.add_argument("--copy-mode", choices=COPY_MODES, default="copy", help="how changed static files are written")
+    parser.add_argument(
+        "--profile", nargs="?", const="build-profile", metavar="PREFIX",
+        help="time each build stage and write PREFIX.json and PREFIX.trace.json (Chrome trace format)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help=f"do not read or write the parsed-content cache in {CACHE_DIR}")
+    parser.add_argument("--cache-size", type=int, default=256, metavar="MB", help="size cap of the parsed-content cache")
+    parser.add_argument(
+        "--fingerprint", action="store_true",
+        help=f"copy static files to content-hashed names, rewrite references to them and write {ASSET_MANIFEST_NAME}",
+    )
+    parser.add_argument(
+        "--search", action="store_true", help="write a prefix-sharded search index and search.js to docs/search/",
+    )
+    parser.add_argument(
+        "--site-url", metavar="URL", help="write sitemap.xml and an Atom feed.xml with absolute links under URL",
+    )
+    parser.add_argument(
+        "--section-index", action="store_true",
+        help="write an index.html listing the pages of every directory that has no index.md of its own",
+    )
+    parser.add_argument("--gzip", action="store_true", help="write .gz siblings for HTML, CSS, JS and SVG files")
+    parser.add_argument("--gzip-min-size", type=int, default=MIN_SIZE, metavar="BYTES", help="smallest file --gzip compresses")
+    parser.add_argument(
+        "--shard", type=parse_shard, metavar="I/N",
+        help="build only the pages whose path hashes to shard I of N; combine the shards with src/shard.py merge",
+    )
+    parser.add_argument("--top", type=int, default=10, help="number of slowest pages listed by --profile")
+    args = parser.parse_args(argv)
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or a positive number")
+    if args.search and args.shard:
+        parser.error("--search indexes the whole site and cannot be combined with --shard")
+    return args
 
 
 if __name__ == "__main__":
@@ -0,0 +1,174 @@
+import os, re, json, hashlib
+
+# Build state lives beside the cache, outside the published docs/
+MANIFEST_PATH = ".markdopus/manifest.json"
+# Where builds before MANIFEST_PATH kept it, inside docs/
+LEGACY_MANIFEST_NAME = ".manifest.json"
+SHARD_MANIFEST_PATTERN = re.compile(r"\.manifest\.shard-(\d+)-of-(\d+)\.json")
+MANIFEST_VERSION = 1
+
+
+def shard_manifest_name(shard):
+    index, count = shard
+    return f".manifest.shard-{index}-of-{count}.json"
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_text_if_changed(path, text):
+    """Leave an identical file untouched so its mtime, and any cache keyed on it, survives; returns 1 if written."""
+    try:
+        with open(path, 'r') as f:
+            if f.read() == text:
+                return 0
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+    return 1
+
+
+class BuildManifest():
+    def __init__(
+        self, path, pages=None, template=None, base_path=None, assets=None, asset_map=None, fingerprints=None,
+        listing=None, generated=None, root=None, renderer=None,
+    ):
+        self.path = path
+        # Output paths are recorded relative to root, the directory the pages are written to
+        self.root = os.path.dirname(path) if root is None else root
+        self.pages = {} if pages is None else pages
+        self.template = template
+        self.base_path = base_path
+        self.assets = [] if assets is None else assets
+        self.asset_map = asset_map
+        self.fingerprints = {} if fingerprints is None else fingerprints
+        self.listing = listing
+        self.generated = [] if generated is None else generated
+        # Version of the parsing and rendering code the pages were built with
+        self.renderer = renderer
+
+
+    @classmethod
+    def load(cls, path, root=None):
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, root=root)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path, root=root)
+        return cls(
+            path, data.get("pages", {}), data.get("template"), data.get("base_path"), data.get("assets", []),
+            data.get("asset_map"), data.get("fingerprints", {}), data.get("listing"), data.get("generated", []), root,
+            data.get("renderer"),
+        )
+
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {
+            "version": MANIFEST_VERSION,
+            "template": self.template,
+            "base_path": self.base_path,
+            "pages": dict(sorted(self.pages.items())),
+            "assets": sorted(self.assets),
+            "asset_map": self.asset_map,
+            "fingerprints": dict(sorted(self.fingerprints.items())),
+            "listing": self.listing,
+            "generated": sorted(self.generated),
+            "renderer": self.renderer,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+
+    def key(self, dest_path):
+        return os.path.relpath(dest_path, self.root).replace(os.sep, "/")
+
+
+    def set_inputs(self, template_hash, base_path, asset_map=None, listing=None, renderer=None):
+        inputs = (template_hash, base_path, asset_map, listing, renderer)
+        if (self.template, self.base_path, self.asset_map, self.listing, self.renderer) != inputs:
+            # Every page is rebuilt, but the entries stay so prune() still removes outputs of deleted pages
+            for entry in self.pages.values():
+                entry["stale"] = True
+        self.template, self.base_path, self.asset_map, self.listing, self.renderer = inputs
+
+
+    def fingerprint(self, source_path, relative_path):
+        """Return the content hash of a static file, reusing the recorded one while its stat is unchanged."""
+        key = relative_path.replace(os.sep, "/")
+        entry = self.fingerprints.get(key)
+        stat = os.stat(source_path)
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["hash"]
+        source_hash = hash_file(source_path)
+        self.fingerprints[key] = {"hash": source_hash, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        return source_hash
+
+
+    def check(self, source_path, dest_path):
+        """Return (fresh, source_hash); the hash is only computed when the stat changed."""
+        entry = self.pages.get(self.key(dest_path))
+        stat = os.stat(source_path)
+        if entry is not None and (entry.get("stale") or not os.path.exists(dest_path)):
+            entry = None
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return True, entry["hash"]
+        source_hash = hash_file(source_path)
+        if entry is not None and entry["hash"] == source_hash:
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+            return True, source_hash
+        return False, source_hash
+
+
+    def record(self, source_path, dest_path, source_hash):
+        stat = os.stat(source_path)
+        self.pages[self.key(dest_path)] = {
+            "source": source_path.replace(os.sep, "/"),
+            "hash": source_hash,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+
+    def prune(self, live_dest_paths):
+        live = {self.key(dest_path) for dest_path in live_dest_paths}
+        removed = []
+        for key in sorted(set(self.pages) - live):
+            dest_path = os.path.join(self.root, key)
+            self.remove(dest_path)
+            removed.append(dest_path)
+        return removed
+
+
+    def remove(self, dest_path):
+        self.pages.pop(self.key(dest_path), None)
+        if os.path.isfile(dest_path):
+            os.remove(dest_path)
+            remove_empty_dirs(os.path.dirname(dest_path), self.root)
+
+
+def remove_empty_dirs(path, stop):
+    stop = os.path.abspath(stop)
+    path = os.path.abspath(path)
+    while path != stop and path.startswith(stop + os.sep):
+        try:
+            os.rmdir(path)
+        except OSError:
+            return
+        path = os.path.dirname(path)
@@ -14,35 +14,71 @@ class BlockType(Enum):
 
 
 def markdown_to_html_node(markdown):
-    children = []
-    blocks = markdown_to_blocks(markdown)
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        match block_type:
-            case BlockType.HEADING:
-                children.append(block_to_heading(block))
-            case BlockType.CODE:
-                children.append(block_to_code(block))
-            case BlockType.QUOTE:
-                children.append(block_to_quote(block))
-            case BlockType.UNORDERED_LIST:
-                children.append(block_to_unordered_list(block))
-            case BlockType.ORDERED_LIST:
-                children.append(block_to_ordered_list(block))
-            case _:
-                children.append(ParentNode("p", text_to_children(block.replace("\n", " "))))
-    return ParentNode("div", children)
+    return blocks_to_html_node(markdown_to_blocks(markdown))
+
+
+def blocks_to_html_node(blocks):
+    return ParentNode("div", [block_to_html_node(block) for block in blocks])
+
+
+def block_to_html_node(block, block_type=None):
+    return BLOCK_RENDERERS[block_type or block_to_block_type(block)](block)
 
 
 def markdown_to_blocks(markdown):
     return [block.strip() for block in markdown.split("\n\n") if block.strip()]
 
 
+def iter_markdown_blocks(lines):
+    # Same blocks as markdown_to_blocks, read from any iterable of lines such as an open file
+    buffer = []
+    for line in lines:
+        if line.endswith("\n"):
+            line = line[:-1]
+        if line:
+            buffer.append(line)
+            continue
+        if buffer:
+            block = "\n".join(buffer).strip()
+            buffer = []
+            if block:
+                yield block
+    if buffer:
+        block = "\n".join(buffer).strip()
+        if block:
+            yield block
+
+
+def iter_classified_blocks(lines):
+    for block in iter_markdown_blocks(lines):
+        yield block, block_to_block_type(block)
+
+
+class MarkdownStream():
+    def __init__(self, lines, transform=None):
+        self.lines = lines
+        self.transform = transform
+
+
+    def write_to(self, sink):
+        sink.write("<div>")
+        for block, block_type in iter_classified_blocks(self.lines):
+            node = block_to_html_node(block, block_type)
+            if self.transform is not None:
+                self.transform(node)
+            node.write_to(sink)
+        sink.write("</div>")
+
+
 def text_to_children(text):
     nodes = text_to_textnodes(text)
     return [text_node_to_html_node(node) for node in nodes]
 
 
+def block_to_paragraph(block):
+    return ParentNode("p", text_to_children(block.replace("\n", " ")))
+
+
 def is_heading(block):
     if not block.startswith("#"):
         return False
@@ -91,8 +127,13 @@ def block_to_unordered_list(block):
 
 
 def is_ordered_list(block):
-    lines = block.split("\n")
-    return all(line.startswith(f"{i+1}. ") for i, line in enumerate(lines))
+    expected = 1
+    for line in block.split("\n"):
+        dot = line.find(". ")
+        if dot < 1 or line[:dot] != str(expected):
+            return False
+        expected += 1
+    return True
 
 
 def block_to_ordered_list(block):
@@ -105,15 +146,28 @@ def block_to_ordered_list(block):
     return ParentNode("ol", nodes)
 
 
+# Block rules are looked up by the first character of the block, so a block
+# only runs the checks that could match it; anything unmatched is a paragraph
+BLOCK_RULES = {}
+BLOCK_RENDERERS = {BlockType.PARAGRAPH: block_to_paragraph}
+
+
+def register_block_type(block_type, renderer, matcher=None, first_chars=""):
+    BLOCK_RENDERERS[block_type] = renderer
+    if matcher is not None:
+        for char in first_chars:
+            BLOCK_RULES.setdefault(char, []).append((matcher, block_type))
+
+
+register_block_type(BlockType.HEADING, block_to_heading, is_heading, "#")
+register_block_type(BlockType.CODE, block_to_code, is_code, "`")
+register_block_type(BlockType.QUOTE, block_to_quote, is_quote, ">")
+register_block_type(BlockType.UNORDERED_LIST, block_to_unordered_list, is_unordered_list, "-")
+register_block_type(BlockType.ORDERED_LIST, block_to_ordered_list, is_ordered_list, "1")
+
+
 def block_to_block_type(block):
-    if is_heading(block):
-        return BlockType.HEADING
-    if is_code(block):
-        return BlockType.CODE
-    if is_quote(block):
-        return BlockType.QUOTE
-    if is_unordered_list(block):
-        return BlockType.UNORDERED_LIST
-    if is_ordered_list(block):
-        return BlockType.ORDERED_LIST
+    for matcher, block_type in BLOCK_RULES.get(block[:1], ()):
+        if matcher(block):
+            return block_type
     return BlockType.PARAGRAPH
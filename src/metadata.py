@@ -0,0 +1,138 @@
+import io, os, json, hashlib
+from htmlnode import LeafNode, ParentNode
+
+INDEX_PATH = ".markdopus/page-index.json"
+INDEX_VERSION = 1
+FRONT_MATTER_FENCE = "---"
+# A page whose title is not within this many bytes of the top is listed without one
+HEAD_LIMIT = 64 << 10
+
+
+def read_front_matter(f):
+    """Read a leading "---" block of "key: value" lines from a text file, leaving f at the body.
+
+    A block that is never closed is not front matter: f goes back to where it was and no fields are returned.
+    """
+    start = f.tell()
+    fields = {}
+    if f.readline().rstrip("\n").rstrip() == FRONT_MATTER_FENCE:
+        for line in iter(f.readline, ""):
+            line = line.rstrip("\n")
+            if line.rstrip() == FRONT_MATTER_FENCE:
+                return fields
+            key, sep, value = line.partition(":")
+            if sep and key.strip():
+                fields[key.strip().lower()] = value.strip()
+    f.seek(start)
+    return {}
+
+
+def split_front_matter(markdown):
+    if not markdown.startswith(FRONT_MATTER_FENCE):
+        return {}, markdown
+    f = io.StringIO(markdown)
+    fields = read_front_matter(f)
+    return fields, f.read() if f.tell() else markdown
+
+
+def scan_page(content_path):
+    # Reads only up to the first "# " heading, never the rest of the body
+    with open(content_path, 'r') as f:
+        fields = read_front_matter(f)
+        title = fields.get("title")
+        line = f.readline()
+        read = 0
+        while title is None and line and read < HEAD_LIMIT:
+            if line.startswith("# "):
+                title = line[1:].rstrip("\n").strip(" ")
+            read += len(line)
+            line = f.readline()
+    return {"title": title, "date": fields.get("date"), "fields": fields}
+
+
+def page_url(dest_path, dest_dir_path):
+    relative_path = os.path.relpath(dest_path, dest_dir_path).replace(os.sep, "/")
+    if relative_path == "index.html":
+        return "/"
+    if relative_path.endswith("/index.html"):
+        return "/" + relative_path[:-len("index.html")]
+    return "/" + relative_path
+
+
+class PageIndex():
+    def __init__(self, path=None, entries=None):
+        self.path = path
+        self.entries = {} if entries is None else entries
+        self.changed = False
+
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get("version") != INDEX_VERSION:
+            return cls(path)
+        return cls(path, data.get("pages", {}))
+
+
+    def save(self):
+        if self.path is None or not self.changed:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": INDEX_VERSION, "pages": dict(sorted(self.entries.items()))}, f, indent=1)
+        os.replace(tmp_path, self.path)
+        self.changed = False
+
+
+    def update(self, pages, dest_dir_path):
+        """Rescan the pages whose size or mtime changed and forget the ones that are gone."""
+        live = set()
+        for content_path, dest_path in pages:
+            key = content_path.replace(os.sep, "/")
+            live.add(key)
+            stat = os.stat(content_path)
+            entry = self.entries.get(key)
+            if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                continue
+            entry = scan_page(content_path)
+            entry.update({"url": page_url(dest_path, dest_dir_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+            self.entries[key] = entry
+            self.changed = True
+        for key in set(self.entries) - live:
+            del self.entries[key]
+            self.changed = True
+        return self
+
+
+    def pages(self):
+        """Entries newest first; undated pages follow in URL order."""
+        entries = sorted(self.entries.values(), key=lambda entry: entry["url"])
+        return sorted(entries, key=lambda entry: entry["date"] or "", reverse=True)
+
+
+    def listing(self):
+        return [{name: entry[name] for name in ("url", "title", "date", "fields")} for entry in self.pages()]
+
+
+    def digest(self):
+        return hashlib.sha256(json.dumps(self.listing()).encode()).hexdigest()
+
+
+def listing_node(pages):
+    items = []
+    for page in pages:
+        children = [LeafNode("a", page["title"] or page["url"], {"href": page["url"]})]
+        if page["date"]:
+            children.append(LeafNode(None, " "))
+            children.append(LeafNode("time", page["date"], {"datetime": page["date"]}))
+        items.append(ParentNode("li", children))
+    return ParentNode("ul", items)
+
+
+def page_slots(fields):
+    return {name.capitalize(): value for name, value in fields.items()}
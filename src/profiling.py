@@ -0,0 +1,86 @@
+import os, json, time
+from contextlib import contextmanager, nullcontext
+
+PAGE_STAGES = ("read", "block_split", "inline_parse", "serialize", "template", "write")
+CACHE_STAGES = ("cache_read", "cache_write")
+
+
+class Profiler():
+    def __init__(self):
+        self.started_ns = time.perf_counter_ns()
+        self.events = []
+
+
+    @contextmanager
+    def stage(self, name, page=None):
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.events.append((name, page, start_ns, time.perf_counter_ns() - start_ns, os.getpid()))
+
+
+    def add(self, events):
+        self.events.extend(events)
+
+
+    def report(self, top=10):
+        stages = {}
+        pages = {}
+        for name, page, _, duration_ns, _ in self.events:
+            stage = stages.setdefault(name, {"total_ms": 0.0, "count": 0})
+            stage["total_ms"] += duration_ns / 1e6
+            stage["count"] += 1
+            if page is not None:
+                timings = pages.setdefault(page, {})
+                timings[name] = timings.get(name, 0.0) + duration_ns / 1e6
+        page_totals = sorted(
+            ({"page": page, "total_ms": sum(timings.values()), "stages": timings} for page, timings in pages.items()),
+            key=lambda entry: (-entry["total_ms"], entry["page"]),
+        )
+        return {
+            "wall_ms": (time.perf_counter_ns() - self.started_ns) / 1e6,
+            "stages": stages,
+            "pages": page_totals,
+            "slowest": page_totals[:top],
+        }
+
+
+    def trace_events(self):
+        return [
+            {
+                "name": name,
+                "cat": "page" if page is not None else "build",
+                "ph": "X",
+                "ts": (start_ns - self.started_ns) / 1e3,
+                "dur": duration_ns / 1e3,
+                "pid": pid,
+                "tid": pid,
+                "args": {} if page is None else {"page": page},
+            }
+            for name, page, start_ns, duration_ns, pid in self.events
+        ]
+
+
+    def write(self, report_path, trace_path, top=10):
+        report = self.report(top)
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=1)
+        with open(trace_path, 'w') as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+        return report
+
+
+def optional_stage(profiler, name, page=None):
+    return nullcontext() if profiler is None else profiler.stage(name, page)
+
+
+def format_summary(report):
+    lines = [f"Build took {report['wall_ms']:.1f} ms"]
+    for name, stage in sorted(report["stages"].items(), key=lambda item: -item[1]["total_ms"]):
+        lines.append(f"  {name:<14} {stage['total_ms']:>10.2f} ms  ({stage['count']} calls)")
+    if report["slowest"]:
+        lines.append(f"Slowest {len(report['slowest'])} pages:")
+    for entry in report["slowest"]:
+        lines.append(f"  {entry['total_ms']:>10.2f} ms  {entry['page']}")
+    return "\n".join(lines)
@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+from htmlnode import ParentNode, transform
+from markdown_blocks import BlockType, BLOCK_RULES, BLOCK_RENDERERS, markdown_to_blocks
+from gencontent import content_visitors
+
+
+class Renderer():
+    """Markdown to HTML with its options and block rules fixed up front; safe to share across threads.
+
+    Recently rendered inputs are kept in a bounded LRU, so a repeated input costs one dict lookup.
+    """
+
+    def __init__(self, base_path="/", assets=None, max_entries=1024):
+        self.base_path = base_path
+        self.assets = assets
+        self.max_entries = max_entries
+        # A snapshot, so block types registered later cannot change what this renderer emits
+        self.block_rules = {char: tuple(rules) for char, rules in BLOCK_RULES.items()}
+        self.block_renderers = dict(BLOCK_RENDERERS)
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+
+    def block_type(self, block):
+        for matcher, block_type in self.block_rules.get(block[:1], ()):
+            if matcher(block):
+                return block_type
+        return BlockType.PARAGRAPH
+
+
+    def render_node(self, markdown):
+        """A fresh HTMLNode tree; never cached since callers may change it."""
+        children = [self.block_renderers[self.block_type(block)](block) for block in markdown_to_blocks(markdown)]
+        return transform(ParentNode("div", children), *content_visitors(self.base_path, self.assets))
+
+
+    def render(self, markdown):
+        with self.lock:
+            html = self.entries.get(markdown)
+            if html is not None:
+                self.entries.move_to_end(markdown)
+                self.hits += 1
+                return html
+            self.misses += 1
+        # Parsed outside the lock; two threads missing on the same input both render it
+        html = self.render_node(markdown).to_html()
+        with self.lock:
+            self.entries[markdown] = html
+            self.entries.move_to_end(markdown)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return html
+
+
+    def render_many(self, markdowns):
+        """HTML for each input in order; an input repeated within the batch is rendered once."""
+        rendered = {}
+        results = []
+        for markdown in markdowns:
+            html = rendered.get(markdown)
+            if html is None:
+                html = rendered[markdown] = self.render(markdown)
+            results.append(html)
+        return results
+
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
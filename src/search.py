@@ -0,0 +1,183 @@
+import os, re, json, shutil
+from manifest import write_text_if_changed
+from htmlnode import walk_events, ENTER
+
+SEARCH_STATE_PATH = ".markdopus/search-state.json"
+SEARCH_DIR = "search"
+STATE_VERSION = 1
+PREFIX_LENGTH = 2
+TOKEN_PATTERN = re.compile(r"\w\w+")
+# Text is not escaped, so a "<" followed by a space, like "< Back", is text rather than a tag
+TAG_PATTERN = re.compile(r"</?[A-Za-z][^>]*>")
+SEARCH_SCRIPT = """// Fetches only the shard for the query's prefix, then decodes its delta-encoded postings
+const searchRoot = new URL(".", document.currentScript.src);
+const searchShards = {};
+async function searchJSON(name) {
+  return (await fetch(new URL(name, searchRoot))).json();
+}
+// The same terms as tokenize() in src/search.py; a bare \\w in JavaScript is ASCII only
+function searchTerms(query) {
+  return query.toLowerCase().match(/[\\p{L}\\p{N}_]{2,}/gu) || [];
+}
+async function search(query) {
+  const meta = await (searchShards.index ??= searchJSON("index.json"));
+  let hits = null;
+  for (const term of searchTerms(query)) {
+    // Sliced by code point, as Python slices it, not by UTF-16 unit
+    const prefix = Array.from(term).slice(0, meta.prefix_length).join("");
+    if (!meta.shards.includes(prefix)) return [];
+    const shard = await (searchShards[prefix] ??= searchJSON(prefix + ".json"));
+    const ids = new Set();
+    for (const [word, deltas] of Object.entries(shard)) {
+      if (!word.startsWith(term)) continue;
+      let id = 0;
+      for (const delta of deltas) ids.add(id += delta);
+    }
+    hits = hits === null ? ids : new Set([...hits].filter((id) => ids.has(id)));
+  }
+  const pages = await (searchShards.pages ??= searchJSON("pages.json"));
+  return [...(hits || [])].map((id) => pages[id]);
+}
+"""
+
+
+def iter_text(root):
+    # Tags separate words exactly as they do when cached HTML is stripped of them
+    for event, node in walk_events(root):
+        if node.tag is not None:
+            yield " "
+        if event is ENTER and node.value:
+            # Raw HTML in a text value reads the same as it does once the page is cached as HTML
+            yield TAG_PATTERN.sub(" ", node.value)
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def content_terms(content):
+    """Terms of rendered content, either an HTMLNode tree or HTML from the content cache."""
+    if isinstance(content, str):
+        return sorted(set(tokenize(TAG_PATTERN.sub(" ", content))))
+    return sorted(set(tokenize("".join(iter_text(content)))))
+
+
+def delta_encode(ids):
+    deltas = []
+    previous = 0
+    for page_id in sorted(ids):
+        deltas.append(page_id - previous)
+        previous = page_id
+    return deltas
+
+
+def delta_decode(deltas):
+    ids = []
+    page_id = 0
+    for delta in deltas:
+        page_id += delta
+        ids.append(page_id)
+    return ids
+
+
+def shard_name(term):
+    return term[:PREFIX_LENGTH]
+
+
+class SearchIndex():
+    def __init__(self, path=None, ids=None, next_id=0, terms=None):
+        self.path = path
+        # Page ids never change or get reused, so shards of untouched terms stay byte-identical
+        self.ids = {} if ids is None else ids
+        self.next_id = next_id
+        self.terms = {} if terms is None else terms
+        self.dirty = set()
+        self.titles = {}
+
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if data.get("version") != STATE_VERSION:
+            return cls(path)
+        return cls(path, data["ids"], data["next_id"], data["terms"])
+
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = {"version": STATE_VERSION, "ids": self.ids, "next_id": self.next_id, "terms": self.terms}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+    def has(self, url):
+        return url in self.ids
+
+
+    def update(self, changed, live_urls, titles=None):
+        """Replace the terms of the changed pages ({url: terms}) and drop pages no longer live."""
+        for url, terms in changed.items():
+            if url not in self.ids:
+                self.ids[url] = self.next_id
+                self.next_id += 1
+            key = str(self.ids[url])
+            self.dirty.update(shard_name(term) for term in self.terms.get(key, ()))
+            self.dirty.update(shard_name(term) for term in terms)
+            self.terms[key] = terms
+        for url in set(self.ids) - set(live_urls):
+            key = str(self.ids.pop(url))
+            self.dirty.update(shard_name(term) for term in self.terms.pop(key, ()))
+        self.titles = titles or {}
+
+
+    def shards(self, prefixes):
+        """Postings {term: [page ids]} of the given prefixes, grouped by prefix."""
+        shards = {prefix: {} for prefix in prefixes}
+        for key, terms in self.terms.items():
+            for term in terms:
+                shard = shards.get(shard_name(term))
+                if shard is not None:
+                    shard.setdefault(term, []).append(int(key))
+        return shards
+
+
+    def write(self, dest_dir, base_path="/"):
+        """Rewrite the shards whose terms changed; a missing search directory is written in full."""
+        search_dir = os.path.join(dest_dir, SEARCH_DIR)
+        prefixes = {shard_name(term) for terms in self.terms.values() for term in terms}
+        if not os.path.isfile(os.path.join(search_dir, "index.json")):
+            self.dirty = prefixes | self.dirty
+        written = 0
+        for prefix, postings in sorted(self.shards(self.dirty).items()):
+            path = os.path.join(search_dir, f"{prefix}.json")
+            if postings:
+                written += write_if_changed(path, {term: delta_encode(ids) for term, ids in sorted(postings.items())})
+            elif os.path.isfile(path):
+                os.remove(path)
+                written += 1
+        pages = {page_id: [base_path + url[1:], self.titles.get(url) or url] for url, page_id in self.ids.items()}
+        written += write_if_changed(os.path.join(search_dir, "pages.json"), dict(sorted(pages.items())))
+        written += write_if_changed(
+            os.path.join(search_dir, "index.json"), {"prefix_length": PREFIX_LENGTH, "shards": sorted(prefixes)},
+        )
+        written += write_text_if_changed(os.path.join(search_dir, "search.js"), SEARCH_SCRIPT)
+        self.dirty = set()
+        return written
+
+
+def write_if_changed(path, data):
+    return write_text_if_changed(path, json.dumps(data, separators=(",", ":")))
+
+
+def remove_search_index(dest_dir, state_path=SEARCH_STATE_PATH):
+    search_dir = os.path.join(dest_dir, SEARCH_DIR)
+    if os.path.isdir(search_dir):
+        shutil.rmtree(search_dir)
+    if os.path.isfile(state_path):
+        os.remove(state_path)
@@ -0,0 +1,294 @@
+import io, os, re, sys, time, argparse, threading
+from email.utils import formatdate, parsedate_to_datetime
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+RELOAD_PATH = "/__livereload"
+# Files at least this large go to the socket with sendfile instead of through Python
+SENDFILE_MIN_SIZE = 64 << 10
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+FINGERPRINT_PATTERN = re.compile(r"\.[0-9a-f]{8}\.\w+$")
+RELOAD_SCRIPT = (
+    f'<script>new EventSource("{RELOAD_PATH}").onmessage = () => location.reload();</script>'
+).encode()
+
+
+class ReloadBroker():
+    def __init__(self):
+        self.generation = 0
+        self.condition = threading.Condition()
+
+
+    def notify(self):
+        with self.condition:
+            self.generation += 1
+            self.condition.notify_all()
+
+
+    def wait(self, generation, timeout=None):
+        with self.condition:
+            self.condition.wait_for(lambda: self.generation != generation, timeout)
+            return self.generation
+
+
+def accepts_gzip(accept_encoding):
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def parse_range(header, size):
+    """Return (start, end) for a single satisfiable byte range, () if unsatisfiable, None to send the whole file."""
+    match = RANGE_PATTERN.fullmatch(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    elif last:
+        start = max(size - int(last), 0)
+        end = size - 1
+    else:
+        return None
+    if start >= size or end < start:
+        return ()
+    return start, end
+
+
+def cache_control(path):
+    if FINGERPRINT_PATTERN.search(os.path.basename(path)):
+        return "public, max-age=31536000, immutable"
+    return "no-cache"
+
+
+def inject_reload_script(body):
+    index = body.rfind(b"</body>")
+    if index == -1:
+        return body + RELOAD_SCRIPT
+    return body[:index] + RELOAD_SCRIPT + body[index:]
+
+
+class DocsHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this keep-alive responses wait on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def handle_one_request(self):
+        self.started = None
+        self.status = None
+        self.body_length = 0
+        super().handle_one_request()
+        if self.status is not None and self.started is not None:
+            self.log_message(
+                '"%s" %d %d %.2f ms', self.requestline, self.status, self.body_length,
+                (time.perf_counter() - self.started) * 1e3,
+            )
+
+
+    def parse_request(self):
+        # Timed from here, once the request line is in: a keep-alive connection idles in readline() before it
+        self.started = time.perf_counter()
+        return super().parse_request()
+
+
+    def log_request(self, code="-", size="-"):
+        # Logged with its latency once the response is complete
+        self.status = int(code)
+
+
+    def do_GET(self):
+        if self.server.reloads is not None and self.path == RELOAD_PATH:
+            self.stream_reloads()
+            return
+        body = self.send_head()
+        if body is not None:
+            try:
+                self.send_body(body)
+            finally:
+                body.close()
+
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not self.path.split("?", 1)[0].endswith("/"):
+                return self.send_default_head()
+            path = os.path.join(path, "index.html")
+        if not os.path.isfile(path):
+            return self.send_default_head()
+        if self.server.reloads is not None and path.endswith(".html"):
+            return self.send_reloading_page(path)
+        return self.send_file(path)
+
+
+    def send_default_head(self):
+        # http.server's own redirect, 404 or directory listing; send_body still needs its length
+        f = super().send_head()
+        if f is not None:
+            start = f.tell()
+            self.body_length = f.seek(0, io.SEEK_END) - start
+            f.seek(start)
+        return f
+
+
+    def send_file(self, path):
+        stat = os.stat(path)
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        range_header = self.headers.get("Range")
+        encoding = None
+        if range_header is None and accepts_gzip(self.headers.get("Accept-Encoding", "")):
+            try:
+                gz_stat = os.stat(path + ".gz")
+            except OSError:
+                gz_stat = None
+            # compress_file gives a .gz its source's mtime, anything else is stale
+            if gz_stat is not None and gz_stat.st_mtime_ns == stat.st_mtime_ns:
+                encoding = "gzip"
+                etag = etag[:-1] + '-gz"'
+
+        if self.is_not_modified(etag, stat.st_mtime):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_validators(path, etag, stat.st_mtime)
+            self.end_headers()
+            return None
+
+        f = open(path + ".gz" if encoding else path, 'rb')
+        size = os.fstat(f.fileno()).st_size
+        byte_range = None
+        if range_header is not None and self.headers.get("If-Range", etag) in (etag, formatdate(stat.st_mtime, usegmt=True)):
+            byte_range = parse_range(range_header, size)
+            if byte_range == ():
+                f.close()
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return None
+        if byte_range:
+            start, end = byte_range
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            f.seek(start)
+            self.body_length = end - start + 1
+        else:
+            self.send_response(HTTPStatus.OK)
+            self.body_length = size
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(self.body_length))
+        self.send_header("Accept-Ranges", "bytes")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_validators(path, etag, stat.st_mtime)
+        self.end_headers()
+        return f
+
+
+    def send_validators(self, path, etag, mtime):
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Cache-Control", cache_control(path))
+
+
+    def is_not_modified(self, etag, mtime):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is None:
+            return False
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+
+
+    def send_body(self, f):
+        remaining = self.body_length
+        if remaining >= SENDFILE_MIN_SIZE and isinstance(f, io.BufferedReader):
+            self.wfile.flush()
+            self.connection.sendfile(f, f.tell(), remaining)
+            return
+        while remaining > 0:
+            chunk = f.read(min(remaining, 1 << 16))
+            if not chunk:
+                break
+            self.wfile.write(chunk)
+            remaining -= len(chunk)
+
+
+    def send_reloading_page(self, path):
+        with open(path, 'rb') as f:
+            body = inject_reload_script(f.read())
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.body_length = len(body)
+        return io.BytesIO(body)
+
+
+    def stream_reloads(self):
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        generation = self.server.reloads.generation
+        try:
+            while True:
+                latest = self.server.reloads.wait(generation, timeout=15)
+                if latest == generation:
+                    self.wfile.write(b": ping\n\n")
+                else:
+                    self.wfile.write(b"data: reload\n\n")
+                    generation = latest
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class DocsServer(ThreadingHTTPServer):
+    request_queue_size = 128
+
+
+def make_server(directory, port=8888, host="", reloads=None):
+    server = DocsServer((host, port), partial(DocsHandler, directory=directory))
+    server.daemon_threads = True
+    server.reloads = reloads
+    return server
+
+
+def serve_in_thread(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Serve the generated site with ETags, pre-compressed .gz files and byte ranges",
+    )
+    parser.add_argument("--directory", default="docs")
+    parser.add_argument("--host", default="")
+    parser.add_argument("--port", type=int, default=8888)
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    server = make_server(args.directory, args.port, args.host)
+    print(f"Serving {args.directory} on http://localhost:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
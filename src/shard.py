@@ -0,0 +1,77 @@
+import os, sys, argparse
+from manifest import BuildManifest, MANIFEST_PATH, SHARD_MANIFEST_PATTERN
+from staticsync import walk_files, is_unchanged, copy_file
+
+
+def find_shard_manifests(dest_dir):
+    shards = {}
+    for name in sorted(os.listdir(dest_dir)):
+        match = SHARD_MANIFEST_PATTERN.fullmatch(name)
+        if match:
+            shards[int(match.group(1)), int(match.group(2))] = os.path.join(dest_dir, name)
+    return shards
+
+
+def copy_shard_outputs(shard_dir, dest_dir):
+    copied = 0
+    for source_path, relative_path in walk_files(shard_dir):
+        dest_path = os.path.join(dest_dir, relative_path)
+        if not is_unchanged(source_path, dest_path):
+            copy_file(source_path, dest_path)
+            copied += 1
+    return copied
+
+
+def merge_shards(dest_dir, shard_dirs=(), manifest_path=MANIFEST_PATH):
+    for shard_dir in shard_dirs:
+        if os.path.abspath(shard_dir) != os.path.abspath(dest_dir):
+            print(f"Copied {copy_shard_outputs(shard_dir, dest_dir)} files from {shard_dir}")
+    shards = find_shard_manifests(dest_dir)
+    if not shards:
+        raise ValueError(f"Error: no shard manifests in {dest_dir}")
+    counts = {count for _, count in shards}
+    if len(counts) != 1:
+        raise ValueError(f"Error: shard manifests from builds of different sizes - {sorted(counts)}")
+    count = counts.pop()
+    missing = sorted(set(range(1, count + 1)) - {index for index, _ in shards})
+    if missing:
+        raise ValueError(f"Error: missing shards {missing} of {count}")
+
+    parts = [BuildManifest.load(shards[index, count]) for index in range(1, count + 1)]
+    first = parts[0]
+    for part in parts[1:]:
+        inputs = (part.template, part.base_path, part.asset_map, part.listing, part.renderer)
+        if inputs != (first.template, first.base_path, first.asset_map, first.listing, first.renderer):
+            raise ValueError(f"Error: {part.path} was built from different inputs than {first.path}")
+    merged = BuildManifest(
+        manifest_path, {}, first.template, first.base_path, [], first.asset_map, {}, first.listing, root=dest_dir,
+        renderer=first.renderer,
+    )
+    for part in parts:
+        merged.pages.update(part.pages)
+        merged.assets = sorted(set(merged.assets) | set(part.assets))
+        merged.fingerprints.update(part.fingerprints)
+        merged.generated = sorted(set(merged.generated) | set(part.generated))
+    merged.save()
+    for part in parts:
+        os.remove(part.path)
+    print(f"Merged {count} shards: {len(merged.pages)} pages, {len(merged.assets)} assets")
+    return merged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Combine the outputs of a build split with --shard I/N")
+    commands = parser.add_subparsers(dest="command", required=True)
+    merge = commands.add_parser("merge", help="merge shard outputs and manifests into one docs/")
+    merge.add_argument("shard_dirs", nargs="*", help="shard output directories to copy in first")
+    merge.add_argument("--dest", default="docs")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    try:
+        merge_shards(args.dest, args.shard_dirs)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+from gencontent import generate_pages_recursive
+from manifest import BuildManifest
+
+
+class SiteTestCase(unittest.TestCase):
+    """A throwaway site in a temporary directory: content/, static/, template.html, built into docs/."""
+
+    TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+    # Markdown of each page, keyed by its path under content/
+    PAGES = {}
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.docs = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        self.write(self.template, self.TEMPLATE)
+        for name, markdown in self.PAGES.items():
+            self.write(os.path.join(self.content, name), markdown)
+
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(text)
+
+
+    def read(self, path):
+        # Relative paths are outputs under docs/
+        with open(os.path.join(self.docs, path), 'r') as f:
+            return f.read()
+
+
+    def snapshot(self, dest):
+        """The bytes of every file under dest, keyed by its path relative to dest."""
+        files = {}
+        for dirpath, _, filenames in os.walk(dest):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, 'rb') as f:
+                    files[os.path.relpath(path, dest)] = f.read()
+        return files
+
+
+    def build(self, base_path="/", **options):
+        manifest = BuildManifest.load(self.manifest_path, self.docs)
+        generate_pages_recursive(base_path, self.content, self.template, self.docs, manifest, **options)
+        return manifest
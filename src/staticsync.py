@@ -0,0 +1,143 @@
+import os, shutil
+from manifest import hash_file, remove_empty_dirs
+from assets import fingerprint_name
+
+COPY_MODES = ("copy", "hardlink", "range")
+LARGE_FILE_SIZE = 1 << 20
+
+
+class SyncStats():
+    def __init__(self):
+        self.copied = 0
+        self.copied_bytes = 0
+        self.skipped = 0
+        self.skipped_bytes = 0
+        self.removed = 0
+        self.urls = {}
+
+
+    def __repr__(self):
+        return (
+            f"Copied {self.copied} files ({self.copied_bytes} bytes), "
+            f"skipped {self.skipped} files ({self.skipped_bytes} bytes), "
+            f"removed {self.removed} files"
+        )
+
+
+def sync_static(source, destination, manifest=None, checksum=False, copy_mode="copy", fingerprint=False):
+    if copy_mode not in COPY_MODES:
+        raise ValueError(f'Error: unknown copy mode - "{copy_mode}"')
+    if fingerprint and manifest is None:
+        raise ValueError("Error: fingerprinting needs a build manifest")
+    stats = SyncStats()
+    synced = []
+    for source_path, relative_path in walk_files(source):
+        if fingerprint:
+            digest = manifest.fingerprint(source_path, relative_path)
+            dest_relative_path = fingerprint_name(relative_path, digest)
+            stats.urls[url_for(relative_path)] = url_for(dest_relative_path)
+        else:
+            dest_relative_path = relative_path
+        dest_path = os.path.join(destination, dest_relative_path)
+        synced.append(dest_path)
+        size = os.path.getsize(source_path)
+        if is_unchanged(source_path, dest_path, checksum):
+            stats.skipped += 1
+            stats.skipped_bytes += size
+            continue
+        copy_file(source_path, dest_path, copy_mode)
+        stats.copied += 1
+        stats.copied_bytes += size
+
+    if manifest is not None:
+        live = {manifest.key(dest_path) for dest_path in synced}
+        for key in sorted(set(manifest.assets) - live):
+            dest_path = os.path.join(manifest.root, key)
+            if os.path.isfile(dest_path):
+                os.remove(dest_path)
+                remove_empty_dirs(os.path.dirname(dest_path), manifest.root)
+                stats.removed += 1
+        manifest.assets = sorted(live)
+        if not fingerprint:
+            manifest.fingerprints = {}
+        else:
+            for key in set(manifest.fingerprints) - {url[1:] for url in stats.urls}:
+                del manifest.fingerprints[key]
+    return stats
+
+
+def url_for(relative_path):
+    return "/" + relative_path.replace(os.sep, "/")
+
+
+def sync_file(source_path, dest_path, manifest):
+    key = manifest.key(dest_path)
+    if os.path.isfile(source_path):
+        if not is_unchanged(source_path, dest_path):
+            copy_file(source_path, dest_path)
+        if key not in manifest.assets:
+            manifest.assets.append(key)
+        return
+    if key in manifest.assets:
+        manifest.assets.remove(key)
+    if os.path.isfile(dest_path):
+        os.remove(dest_path)
+        remove_empty_dirs(os.path.dirname(dest_path), manifest.root)
+
+
+def walk_files(source, prefix=""):
+    for entry in sorted(os.scandir(source), key=lambda entry: entry.name):
+        relative_path = os.path.join(prefix, entry.name)
+        if entry.is_dir():
+            yield from walk_files(entry.path, relative_path)
+        elif entry.is_file():
+            yield entry.path, relative_path
+
+
+def is_unchanged(source_path, dest_path, checksum=False):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    source_stat = os.stat(source_path)
+    if source_stat.st_size != dest_stat.st_size:
+        return False
+    if checksum:
+        return hash_file(source_path) == hash_file(dest_path)
+    return source_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+
+def copy_file(source_path, dest_path, copy_mode="copy"):
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    tmp_path = dest_path + ".tmp"
+    if copy_mode == "hardlink":
+        try:
+            if os.path.lexists(tmp_path):
+                os.remove(tmp_path)
+            os.link(source_path, tmp_path)
+            os.replace(tmp_path, dest_path)
+            return
+        except OSError:
+            pass
+    if copy_mode == "range" and os.path.getsize(source_path) >= LARGE_FILE_SIZE:
+        copy_range(source_path, tmp_path)
+    else:
+        shutil.copyfile(source_path, tmp_path)
+    shutil.copystat(source_path, tmp_path)
+    os.replace(tmp_path, dest_path)
+
+
+def copy_range(source_path, dest_path):
+    with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        try:
+            while remaining > 0:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        except (AttributeError, OSError):
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+            shutil.copyfileobj(src, dst)
@@ -0,0 +1,56 @@
+import os, re
+from functools import lru_cache
+from assets import resolve_url
+
+SLOT_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+ROOT_URL_PATTERN = re.compile(r'(href|src)="(/[^"]*)')
+
+
+class Template():
+    def __init__(self, text, base_path="/", assets=None):
+        text = ROOT_URL_PATTERN.sub(
+            lambda match: f'{match.group(1)}="{resolve_url(match.group(2), base_path, assets)}', text,
+        )
+        self.parts = []
+        self.slots = {}
+        start = 0
+        for match in SLOT_PATTERN.finditer(text):
+            self.parts.append(text[start:match.start()])
+            self.slots[len(self.parts)] = (match.group(1), match.group())
+            self.parts.append(match.group())
+            start = match.end()
+        self.parts.append(text[start:])
+
+
+    def slot_names(self):
+        return {name for name, _ in self.slots.values()}
+
+
+    def render(self, **values):
+        parts = self.parts.copy()
+        for index, (name, literal) in self.slots.items():
+            value = values.get(name, literal)
+            parts[index] = value if isinstance(value, str) else value.to_html()
+        return "".join(parts)
+
+
+    def write_to(self, sink, **values):
+        write = sink.write
+        for index, part in enumerate(self.parts):
+            slot = self.slots.get(index)
+            value = part if slot is None else values.get(slot[0], slot[1])
+            if isinstance(value, str):
+                write(value)
+            else:
+                value.write_to(sink)
+
+
+def load_template(template_path, base_path="/", assets=None):
+    stat = os.stat(template_path)
+    return compile_template_file(template_path, base_path, stat.st_mtime_ns, stat.st_size, assets)
+
+
+@lru_cache(maxsize=16)
+def compile_template_file(template_path, base_path, mtime_ns, size, assets=None):
+    with open(template_path, 'r') as f:
+        return Template(f.read(), base_path, assets)
@@ -0,0 +1,43 @@
+import os
+import json
+import tempfile
+import unittest
+from assets import AssetMap, fingerprint_name, resolve_url
+
+
+class TestAssets(unittest.TestCase):
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name("index.css", "3f9a1c0b77"), "index.3f9a1c0b.css")
+        self.assertEqual(fingerprint_name(os.path.join("images", "tom.png"), "ab12cd34ef"), os.path.join("images", "tom.ab12cd34.png"))
+        self.assertEqual(fingerprint_name("CNAME", "ab12cd34ef"), "CNAME.ab12cd34")
+
+
+    def test_resolve_keeps_query_and_fragment(self):
+        assets = AssetMap({"/index.css": "/index.0123abcd.css"})
+        self.assertEqual(assets.resolve("/index.css#x"), "/index.0123abcd.css#x")
+        self.assertEqual(assets.resolve("/index.css?v=2"), "/index.0123abcd.css?v=2")
+        self.assertEqual(assets.resolve("/blog/"), "/blog/")
+        self.assertEqual(resolve_url("/index.css", "/site/", assets), "/site/index.0123abcd.css")
+        self.assertEqual(resolve_url("/index.css", "/site/"), "/site/index.css")
+
+
+    def test_digest_ignores_insertion_order(self):
+        first = AssetMap({"/a.css": "/a.1.css", "/b.js": "/b.2.js"})
+        second = AssetMap({"/b.js": "/b.2.js", "/a.css": "/a.1.css"})
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertNotEqual(first, AssetMap())
+
+
+    def test_write_only_when_changed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "asset-manifest.json")
+            assets = AssetMap({"/index.css": "/index.0123abcd.css"})
+            self.assertTrue(assets.write(path))
+            self.assertFalse(assets.write(path))
+            with open(path, 'r') as f:
+                self.assertEqual(json.load(f), assets.urls)
+
+
+if __name__ == "__main__":
+    unittest.main()
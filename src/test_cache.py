@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import cache as cache_module
+from cache import ContentCache, BASE_MARKER
+from gencontent import render_content, generate_pages_recursive
+from assets import AssetMap
+
+
+class TestContentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ContentCache(os.path.join(self.tmp.name, "cache"))
+
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+    def test_miss_then_hit(self):
+        self.assertIsNone(self.cache.get("# Hi"))
+        self.cache.put("# Hi", "<div><h1>Hi</h1></div>")
+        self.assertEqual(self.cache.get("# Hi"), "<div><h1>Hi</h1></div>")
+
+
+    def test_parser_version_covers_render_modules(self):
+        for name in ("inline_markdown.py", "gencontent.py", "assets.py"):
+            self.assertIn(name, cache_module.PARSER_MODULES)
+            self.assertTrue(os.path.isfile(os.path.join(os.path.dirname(cache_module.__file__), name)))
+
+
+    def test_parser_version_is_part_of_the_key(self):
+        self.cache.put("# Hi", "<div>old</div>")
+        with mock.patch.object(cache_module, "parser_version", return_value="changed"):
+            self.assertIsNone(self.cache.get("# Hi"))
+
+
+    def test_render_content_reuses_cache_across_base_paths(self):
+        markdown = "# Hi\n\n[home](/) and **bold**"
+        first = render_content(markdown, "/", self.cache)
+        self.assertEqual(first, '<div><h1>Hi</h1><p><a href="/">home</a> and <b>bold</b></p></div>')
+        with mock.patch("gencontent.markdown_to_blocks") as parse:
+            second = render_content(markdown, "/site/", self.cache)
+        parse.assert_not_called()
+        self.assertEqual(second, '<div><h1>Hi</h1><p><a href="/site/">home</a> and <b>bold</b></p></div>')
+
+
+    def test_cached_content_resolves_fingerprinted_urls(self):
+        markdown = "# Hi\n\n![tom](/images/tom.png) [css](/index.css)"
+        assets = AssetMap({"/images/tom.png": "/images/tom.0123abcd.png"})
+        uncached = render_content(markdown, "/site/", None, assets).to_html()
+        render_content(markdown, "/", self.cache)
+        self.assertEqual(render_content(markdown, "/site/", self.cache, assets), uncached)
+        self.assertIn('src="/site/images/tom.0123abcd.png"', uncached)
+        self.assertIn('href="/site/index.css"', uncached)
+
+
+    def test_marker_in_source_is_not_cached(self):
+        markdown = f"# Hi\n\nodd {BASE_MARKER} byte"
+        render_content(markdown, "/", self.cache)
+        self.assertIsNone(self.cache.get(markdown))
+
+
+    def test_evict_removes_least_recently_used(self):
+        self.cache.max_bytes = 25
+        for i in range(3):
+            self.cache.put(f"page {i}", "x" * 10)
+            os.utime(self.cache.path(self.cache.key(f"page {i}")), ns=(i, i))
+        os.utime(self.cache.path(self.cache.key("page 0")), ns=(10, 10))
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertIsNone(self.cache.get("page 1"))
+        self.assertIsNotNone(self.cache.get("page 0"))
+        self.assertIsNotNone(self.cache.get("page 2"))
+
+
+    def test_cached_build_matches_uncached_build(self):
+        content = os.path.join(self.tmp.name, "content")
+        template = os.path.join(self.tmp.name, "template.html")
+        os.makedirs(content)
+        with open(template, 'w') as f:
+            f.write('<link href="/x.css">{{ Title }}{{ Content }}')
+        with open(os.path.join(content, "index.md"), 'w') as f:
+            f.write("# Home\n\n![pic](/a.png)\n\n- [one](/one)")
+        outputs = []
+        for name, page_cache in (("plain", None), ("cold", self.cache), ("warm", self.cache)):
+            dest = os.path.join(self.tmp.name, name)
+            generate_pages_recursive("/base/", content, template, dest, cache=page_cache)
+            with open(os.path.join(dest, "index.html"), 'r') as f:
+                outputs.append(f.read())
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], outputs[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
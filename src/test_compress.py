@@ -0,0 +1,85 @@
+import gzip
+import os
+import tempfile
+import unittest
+from compress import compress_tree, remove_gzip_siblings
+
+
+class TestCompressTree(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.docs = self.tmp.name
+        os.makedirs(os.path.join(self.docs, "blog"))
+        self.write("index.html", "<p>hello</p>" * 200)
+        self.write(os.path.join("blog", "post.html"), "<p>post</p>" * 200)
+        self.write("index.css", "body {}")
+        self.write("image.png", "x" * 5000)
+
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+    def write(self, name, text):
+        with open(os.path.join(self.docs, name), 'w') as f:
+            f.write(text)
+
+
+    def path(self, name):
+        return os.path.join(self.docs, name)
+
+
+    def test_compresses_text_files_above_threshold(self):
+        stats = compress_tree(self.docs, min_size=1024)
+        self.assertEqual(stats.compressed, 2)
+        self.assertLess(stats.ratio(), 0.1)
+        with gzip.open(self.path("index.html.gz"), 'rt') as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 200)
+        self.assertFalse(os.path.exists(self.path("index.css.gz")))
+        self.assertFalse(os.path.exists(self.path("image.png.gz")))
+
+
+    def test_unchanged_sources_are_skipped(self):
+        compress_tree(self.docs, min_size=1024)
+        stats = compress_tree(self.docs, min_size=1024)
+        self.assertEqual((stats.compressed, stats.skipped), (0, 2))
+        self.write("index.html", "<p>changed</p>" * 200)
+        os.utime(self.path("index.html"), ns=(1, 1))
+        stats = compress_tree(self.docs, min_size=1024)
+        self.assertEqual((stats.compressed, stats.skipped), (1, 1))
+
+
+    def test_output_is_deterministic(self):
+        compress_tree(self.docs, min_size=1024)
+        with open(self.path("index.html.gz"), 'rb') as f:
+            first = f.read()
+        os.remove(self.path("index.html.gz"))
+        compress_tree(self.docs, min_size=1024)
+        with open(self.path("index.html.gz"), 'rb') as f:
+            self.assertEqual(f.read(), first)
+
+
+    def test_stale_gz_files_are_removed(self):
+        compress_tree(self.docs, min_size=1024)
+        os.remove(self.path(os.path.join("blog", "post.html")))
+        stats = compress_tree(self.docs, min_size=1024)
+        self.assertEqual(stats.removed, 1)
+        self.assertFalse(os.path.exists(self.path(os.path.join("blog", "post.html.gz"))))
+
+
+    def test_remove_gzip_siblings_keeps_only_fresh_ones(self):
+        self.write("gone.css", "x" * 2000)
+        compress_tree(self.docs, min_size=1024)
+        os.remove(self.path("gone.css"))
+        self.write("index.html", "<p>changed</p>" * 200)
+        os.utime(self.path("index.html"), ns=(1, 1))
+        self.write("archive.tar.gz", "x")
+        self.assertEqual(remove_gzip_siblings(self.docs), 2)
+        self.assertFalse(os.path.exists(self.path("index.html.gz")))
+        self.assertFalse(os.path.exists(self.path("gone.css.gz")))
+        self.assertTrue(os.path.exists(self.path(os.path.join("blog", "post.html.gz"))))
+        self.assertTrue(os.path.exists(self.path("archive.tar.gz")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import io
+import os
+import re
+import gzip
+import socket
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+import daemon
+from daemon import make_daemon_server, send_request, request_or_build, is_running
+from cache import ContentCache, MemoryCache
+from gencontent import generate_pages, find_pages
+
+
+class TestBuildDaemon(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        os.makedirs("content/blog")
+        os.makedirs("static")
+        with open("template.html", 'w') as f:
+            f.write('<link href="/index.css">{{ Title }}{{ Content }}')
+        with open("content/index.md", 'w') as f:
+            f.write("# Home\n\n[post](/blog/post)")
+        with open("content/blog/post.md", 'w') as f:
+            f.write("# Post")
+        with open("static/index.css", 'w') as f:
+            f.write("body {}")
+        self.socket_path = os.path.join(self.tmp.name, "daemon.sock")
+
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+
+    def start_daemon(self):
+        server = make_daemon_server(self.socket_path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+
+    def read(self, path):
+        with open(path, 'r') as f:
+            return f.read()
+
+
+    def test_build_and_render_through_daemon(self):
+        server = self.start_daemon()
+        self.assertTrue(is_running(self.socket_path))
+        response = send_request({"command": "build", "args": ["/site/"]}, self.socket_path)
+        self.assertTrue(response["ok"], response)
+        self.assertEqual(response["pages"], 2)
+        self.assertIn('<a href="/site/blog/post">post</a>', self.read("docs/index.html"))
+
+        with open("content/blog/post.md", 'w') as f:
+            f.write("# Post\n\nEdited")
+        response = send_request({"command": "render", "paths": ["content/blog/post.md"], "base_path": "/site/"}, self.socket_path)
+        self.assertTrue(response["ok"], response)
+        self.assertEqual(response["rebuilt"], [os.path.normpath("content/blog/post.md")])
+        self.assertIn("Edited", self.read("docs/blog/post.html"))
+        self.assertEqual(send_request({"command": "ping"}, self.socket_path)["builds"], 1)
+        self.assertGreater(len(server.builder.cache.entries), 0)
+
+
+    def test_render_keeps_the_last_builds_options(self):
+        self.start_daemon()
+        response = send_request({"command": "build", "args": ["/site/", "--fingerprint", "--gzip", "--gzip-min-size", "0"]}, self.socket_path)
+        self.assertTrue(response["ok"], response)
+
+        with open("static/index.css", 'w') as f:
+            f.write("body { margin: 0 }")
+        with open("content/blog/post.md", 'w') as f:
+            f.write("# Post\n\nEdited")
+        response = send_request(
+            {"command": "render", "paths": ["static/index.css", "content/blog/post.md"], "base_path": "/site/"},
+            self.socket_path,
+        )
+        self.assertTrue(response["ok"], response)
+        css_url = re.search(r'href="/site/(index\.[0-9a-f]{8}\.css)"', self.read("docs/index.html")).group(1)
+        self.assertEqual(self.read(os.path.join("docs", css_url)), "body { margin: 0 }")
+        with gzip.open("docs/blog/post.html.gz", 'rt') as f:
+            self.assertIn("Edited", f.read())
+
+
+    def test_bad_build_options_do_not_stop_the_daemon(self):
+        self.start_daemon()
+        response = send_request({"command": "build", "args": ["--jobs", "-1"]}, self.socket_path)
+        self.assertFalse(response["ok"])
+        self.assertIn("--jobs must be 0 or a positive number", response["output"])
+        self.assertTrue(is_running(self.socket_path))
+
+
+    def test_empty_reply_is_an_error(self):
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(server.close)
+        server.bind(self.socket_path)
+        server.listen(1)
+
+        def hang_up():
+            connection, _ = server.accept()
+            connection.recv(1024)
+            connection.close()
+
+        threading.Thread(target=hang_up, daemon=True).start()
+        response = send_request({"command": "ping"}, self.socket_path, timeout=5)
+        self.assertFalse(response["ok"])
+        self.assertIn("without a reply", response["error"])
+
+
+    def test_unknown_command_and_bad_json(self):
+        self.start_daemon()
+        response = send_request({"command": "dance"}, self.socket_path)
+        self.assertFalse(response["ok"])
+        self.assertIn("unknown command", response["error"])
+
+
+    def test_client_falls_back_to_in_process_build(self):
+        self.assertFalse(is_running(self.socket_path))
+        with redirect_stdout(io.StringIO()) as output:
+            response = request_or_build({"command": "build", "args": []}, self.socket_path)
+        self.assertTrue(response["ok"])
+        self.assertIn("building in-process", output.getvalue())
+        self.assertTrue(os.path.exists("docs/blog/post.html"))
+
+
+    def test_stop_without_daemon_fails(self):
+        self.assertFalse(request_or_build({"command": "shutdown"}, self.socket_path)["ok"])
+
+
+    def test_build_passes_options_through(self):
+        for argv, expected in (
+            (["build", "--clean", "-j", "2", "/site/"], ["--clean", "-j", "2", "/site/"]),
+            (["build", "--", "--clean"], ["--clean"]),
+            (["build"], []),
+        ):
+            with mock.patch("daemon.request_or_build", return_value={"ok": True}) as request:
+                daemon.main(argv)
+            self.assertEqual(request.call_args.args[0], {"command": "build", "args": expected})
+
+
+    def test_unknown_options_outside_build_are_rejected(self):
+        with redirect_stdout(io.StringIO()), mock.patch("sys.stderr", io.StringIO()), self.assertRaises(SystemExit):
+            daemon.main(["status", "--clean"])
+
+
+    def test_workers_get_only_the_disk_cache(self):
+        cache = MemoryCache(ContentCache("cache"))
+        maps = []
+
+        class SerialExecutor():
+            def __init__(self, max_workers):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def map(self, function, items, chunksize=1):
+                maps.append(function)
+                return map(function, items)
+
+        with redirect_stdout(io.StringIO()), mock.patch("gencontent.ProcessPoolExecutor", SerialExecutor):
+            generate_pages("/", find_pages("content", "docs"), "template.html", jobs=2, cache=cache)
+        self.assertIs(maps[0].args[3], cache.backing)
+        self.assertEqual(sum(len(files) for _, _, files in os.walk("cache")), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
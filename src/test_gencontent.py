@@ -0,0 +1,89 @@
+import os
+import tracemalloc
+import unittest
+from unittest import mock
+import gencontent
+from assets import AssetMap
+from gencontent import find_pages, generate_page, generate_pages_recursive
+from sitefixture import SiteTestCase
+
+
+class TestGeneratePages(SiteTestCase):
+    TEMPLATE = '<title>{{ Title }}</title><link href="/index.css"><main>{{ Content }}</main>'
+    PAGES = {
+        f"section{i % 3}/page{i}.md": f"# Page {i}\n\nSome **bold** and a [link](/page{i}).\n\n- one\n- two"
+        for i in range(12)
+    }
+
+    def test_find_pages(self):
+        pages = find_pages(self.content, "docs")
+        self.assertEqual(len(pages), 12)
+        self.assertIn(
+            (os.path.join(self.content, "section1", "page4.md"), os.path.join("docs", "section1", "page4.html")),
+            pages,
+        )
+
+
+    def test_parallel_output_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+        generate_pages_recursive("/base/", self.content, self.template, serial)
+        generate_pages_recursive("/base/", self.content, self.template, parallel, jobs=3)
+        self.assertEqual(len(self.snapshot(serial)), 12)
+        self.assertEqual(self.snapshot(serial), self.snapshot(parallel))
+
+
+    def test_base_path_rewrites_urls_but_not_text(self):
+        page = os.path.join(self.content, "code.md")
+        with open(page, 'w') as f:
+            f.write('# Code\n\n[home](/) ![pic](/a.png) `href="/x"`')
+        dest = os.path.join(self.root, "out", "code.html")
+        generate_page("/base/", page, self.template, dest)
+        with open(dest, 'r') as f:
+            html = f.read()
+        self.assertIn('<link href="/base/index.css">', html)
+        self.assertIn('<a href="/base/">home</a>', html)
+        self.assertIn('<img src="/base/a.png" alt="pic"></img>', html)
+        self.assertIn('<code>href="/x"</code>', html)
+
+
+    def test_images_get_sizes_and_all_but_the_first_are_lazy(self):
+        page = os.path.join(self.content, "pics.md")
+        with open(page, 'w') as f:
+            f.write("# Pics\n\n![a](/a.png)\n\n![b](/b.png?v=2) ![c](/c.png)")
+        assets = AssetMap(sizes={"/a.png": (10, 20), "/b.png": (30, 40)})
+        dest = os.path.join(self.root, "out", "pics.html")
+        generate_page("/base/", page, self.template, dest, assets=assets)
+        with open(dest, 'r') as f:
+            html = f.read()
+        self.assertIn('<img src="/base/a.png" alt="a" width="10" height="20"></img>', html)
+        self.assertIn('<img src="/base/b.png?v=2" alt="b" width="30" height="40" loading="lazy" decoding="async"></img>', html)
+        self.assertIn('<img src="/base/c.png" alt="c" loading="lazy" decoding="async"></img>', html)
+        streamed = os.path.join(self.root, "out", "streamed.html")
+        with mock.patch.object(gencontent, "STREAM_THRESHOLD", 0):
+            generate_page("/base/", page, self.template, streamed, assets=assets)
+        with open(streamed, 'r') as f:
+            self.assertEqual(f.read(), html)
+
+
+    def test_large_page_is_streamed_with_bounded_memory(self):
+        page = os.path.join(self.content, "big.md")
+        with open(page, 'w') as f:
+            f.write("# Big\n\n")
+            for i in range(20000):
+                f.write(f"Paragraph {i} with **bold** and a [link](/p{i}).\n\n- item\n- item\n\n")
+        normal = os.path.join(self.root, "out", "normal.html")
+        streamed = os.path.join(self.root, "out", "streamed.html")
+        generate_page("/base/", page, self.template, normal)
+        with mock.patch.object(gencontent, "STREAM_THRESHOLD", 0):
+            tracemalloc.start()
+            generate_page("/base/", page, self.template, streamed)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        with open(normal, 'r') as a, open(streamed, 'r') as b:
+            self.assertEqual(a.read(), b.read())
+        self.assertLess(peak, os.path.getsize(page) // 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
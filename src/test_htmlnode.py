@@ -1,5 +1,7 @@
+import io
 import unittest
-from htmlnode import HTMLNode, LeafNode, ParentNode
+import sys
+from htmlnode import HTMLNode, LeafNode, ParentNode, ENTER, EXIT, walk_events, walk, walk_post, transform
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -123,5 +125,118 @@ class TestParentClass(unittest.TestCase):
         self.assertNotEqual(node_a, node_b)
 
 
+class TestCompactNodes(unittest.TestCase):
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HTMLNode("p"), LeafNode("b", "x"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+
+    def test_tags_are_interned(self):
+        level = 2
+        self.assertIs(ParentNode(f"h{level}", []).tag, ParentNode("h2", []).tag)
+
+
+    def test_empty_props_share_none(self):
+        node = LeafNode("b", "x", {})
+        self.assertIsNone(node.props)
+        self.assertEqual(node.to_html(), "<b>x</b>")
+
+
+class TestStreamingSerializer(unittest.TestCase):
+    def setUp(self):
+        self.tree = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "Hello "), LeafNode("b", "world")]),
+            LeafNode("a", "link", {"href": "/x"}),
+        ])
+
+
+    def test_iter_html_chunks(self):
+        self.assertEqual(
+            list(self.tree.iter_html()),
+            ["<div>", "<p>", "Hello ", "<b>world</b>", "</p>", '<a href="/x">link</a>', "</div>"],
+        )
+
+
+    def test_write_to_matches_to_html(self):
+        sink = io.StringIO()
+        self.tree.write_to(sink)
+        self.assertEqual(sink.getvalue(), self.tree.to_html())
+
+
+    def test_write_to_raises_for_invalid_child(self):
+        with self.assertRaises(ValueError):
+            ParentNode("div", [LeafNode("b", None)]).write_to(io.StringIO())
+
+
+    def test_base_node_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            HTMLNode("p", "Hello").to_html()
+
+
+def nested(depth, leaf="x"):
+    node = LeafNode("b", leaf)
+    for _ in range(depth):
+        node = ParentNode("span", [node])
+    return node
+
+
+class TestTraversal(unittest.TestCase):
+    def setUp(self):
+        self.tree = ParentNode("div", [
+            ParentNode("p", [LeafNode(None, "Hello "), LeafNode("b", "world")]),
+            LeafNode("a", "link", {"href": "/x"}),
+        ])
+
+
+    def test_walk_pre_order(self):
+        self.assertEqual([node.tag for node in walk(self.tree)], ["div", "p", None, "b", "a"])
+
+
+    def test_walk_post_order(self):
+        self.assertEqual([node.tag for node in walk_post(self.tree)], [None, "b", "p", "a", "div"])
+
+
+    def test_walk_events_bracket_subtrees(self):
+        events = [(event, node.tag) for event, node in walk_events(self.tree.children[0])]
+        self.assertEqual(events, [
+            (ENTER, "p"), (ENTER, None), (EXIT, None), (ENTER, "b"), (EXIT, "b"), (EXIT, "p"),
+        ])
+
+
+    def test_transform_runs_visitors_in_one_pass(self):
+        seen = []
+        transform(self.tree, lambda node: seen.append(("first", node.tag)), lambda node: seen.append(("second", node.tag)))
+        self.assertEqual(seen[:4], [("first", "div"), ("second", "div"), ("first", "p"), ("second", "p")])
+        self.assertEqual(len(seen), 10)
+
+
+    def test_transform_replaces_nodes(self):
+        def unwrap_bold(node):
+            if node.tag == "b":
+                return LeafNode("strong", node.value)
+        root = transform(self.tree, unwrap_bold)
+        self.assertIs(root, self.tree)
+        self.assertEqual(root.to_html(), '<div><p>Hello <strong>world</strong></p><a href="/x">link</a></div>')
+
+
+    def test_transform_replaces_root(self):
+        self.assertEqual(transform(LeafNode("b", "x"), lambda node: LeafNode("i", node.value)).to_html(), "<i>x</i>")
+
+
+    def test_deep_nesting_beyond_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 2
+        html = nested(depth).to_html()
+        self.assertTrue(html.startswith("<span>" * depth + "<b>x</b>"))
+        self.assertEqual(nested(depth), nested(depth))
+        self.assertNotEqual(nested(depth), nested(depth, "y"))
+        self.assertEqual(sum(1 for _ in walk_post(nested(depth))), depth + 1)
+
+
+    def test_eq_compares_children(self):
+        self.assertNotEqual(self.tree, ParentNode("div", [self.tree.children[0]]))
+        self.assertNotEqual(LeafNode("b", "x"), ParentNode("b", []))
+        self.assertNotEqual(LeafNode("b", "x"), "x")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,82 @@
+import os
+import struct
+import tempfile
+import unittest
+from unittest import mock
+import imagesize
+from imagesize import image_size, image_sizes
+
+
+def png_bytes(width, height):
+    return b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+
+
+def jpeg_bytes(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + bytes(9)
+    dht = b"\xff\xc4" + struct.pack(">H", 5) + bytes(3)
+    sof = b"\xff\xc2" + struct.pack(">HBHH", 17, 8, height, width) + bytes(10)
+    return b"\xff\xd8" + app0 + dht + sof + b"\xff\xda"
+
+
+class TestImageSize(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+    def write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+
+    def test_png(self):
+        self.assertEqual(image_size(self.write("a.png", png_bytes(928, 468))), (928, 468))
+
+
+    def test_gif(self):
+        self.assertEqual(image_size(self.write("a.gif", b"GIF89a" + struct.pack("<HH", 31, 7) + bytes(20))), (31, 7))
+
+
+    def test_jpeg_skips_segments_before_the_frame(self):
+        self.assertEqual(image_size(self.write("a.jpg", jpeg_bytes(1344, 896))), (1344, 896))
+
+
+    def test_webp_variants(self):
+        lossy = b"RIFF" + bytes(4) + b"WEBPVP8 " + bytes(10) + struct.pack("<HH", 640, 480)
+        lossless = b"RIFF" + bytes(4) + b"WEBPVP8L" + bytes(5) + struct.pack("<I", 99 | (49 << 14)) + bytes(5)
+        extended = b"RIFF" + bytes(4) + b"WEBPVP8X" + bytes(8) + (1999).to_bytes(3, "little") + (999).to_bytes(3, "little")
+        self.assertEqual(image_size(self.write("a.webp", lossy)), (640, 480))
+        self.assertEqual(image_size(self.write("b.webp", lossless)), (100, 50))
+        self.assertEqual(image_size(self.write("c.webp", extended)), (2000, 1000))
+
+
+    def test_unknown_or_truncated_files(self):
+        self.assertIsNone(image_size(self.write("a.png", b"not an image")))
+        self.assertIsNone(image_size(self.write("b.jpg", b"\xff\xd8\xff\xe0\x00")))
+
+
+    def test_size_is_cached_until_the_file_changes(self):
+        path = self.write("a.png", png_bytes(10, 20))
+        image_size(path)
+        with mock.patch.object(imagesize, "parse_image_size") as parse:
+            self.assertEqual(image_size(path), (10, 20))
+        parse.assert_not_called()
+        self.write("a.png", png_bytes(30, 40))
+        os.utime(path, ns=(1, 1))
+        self.assertEqual(image_size(path), (30, 40))
+
+
+    def test_image_sizes_maps_urls(self):
+        self.write(os.path.join("images", "a.png"), png_bytes(1, 2))
+        self.write("index.css", b"body {}")
+        self.assertEqual(image_sizes(self.tmp.name), {"/images/a.png": (1, 2)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import re
+import random
 import unittest
 from textnode import TextNode, TextType
 from inline_markdown import (
@@ -7,8 +9,13 @@ from inline_markdown import (
     text_to_textnodes,
     extract_markdown_images,
     extract_markdown_links,
+    iter_bracketed,
 )
 
+# The regexes iter_bracketed replaced; they backtrack to the end of the text from every unclosed "["
+REFERENCE_IMAGE_PATTERN = re.compile(r"!\[([^]]*)\]\(([^()]*)\)")
+REFERENCE_LINK_PATTERN = re.compile(r"(?<!!)\[([^]]*)\]\(([^()]*)\)")
+
 
 class TestSplitNodesDelimiter(unittest.TestCase):
 
@@ -270,6 +277,87 @@ class TestSplitNodes(unittest.TestCase):
             nodes,
         )
 
+
+def five_pass_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+
+class TestSinglePassTokenizer(unittest.TestCase):
+    def assertMatchesFivePass(self, text):
+        try:
+            expected = five_pass_textnodes(text)
+        except ValueError:
+            with self.assertRaises(ValueError, msg=text):
+                text_to_textnodes(text)
+            return
+        self.assertListEqual(expected, text_to_textnodes(text), msg=text)
+
+
+    def test_plain_text_fast_path(self):
+        self.assertEqual(text_to_textnodes("just words * here"), [TextNode("just words * here", TextType.TEXT)])
+
+
+    def test_empty_text(self):
+        self.assertEqual(text_to_textnodes(""), [])
+
+
+    def test_delimiters_inside_bold_are_literal(self):
+        self.assertEqual(text_to_textnodes("**a_b`c**"), [TextNode("a_b`c", TextType.BOLD)])
+
+
+    def test_link_inside_italic_is_literal(self):
+        self.assertEqual(text_to_textnodes("_[a](b)_"), [TextNode("[a](b)", TextType.ITALIC)])
+
+
+    def test_unclosed_delimiters_raise(self):
+        for text in ("**open", "_open", "`open", "`a_b_c`", "_a **b** c_", "snake_case"):
+            with self.assertRaises(ValueError, msg=text):
+                text_to_textnodes(text)
+
+
+    def test_image_before_link_precedence(self):
+        self.assertMatchesFivePass("[a ![b](c)](d) and ![x](y(z)) [l](u)")
+
+
+    def test_random_inputs_match_five_pass_pipeline(self):
+        rng = random.Random(1234)
+        pieces = ["a", " ", "**", "*", "_", "`", "[", "]", "(", ")", "!", "![i](s)", "[l](u)", "word"]
+        for _ in range(3000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 14)))
+            self.assertMatchesFivePass(text)
+
+
+class TestIterBracketed(unittest.TestCase):
+    def reference(self, pattern, text, start, end):
+        return [(m.start(), m.end(), m.group(1), m.group(2)) for m in pattern.finditer(text, start, end)]
+
+
+    def test_random_inputs_match_reference_patterns(self):
+        rng = random.Random(4321)
+        pieces = ["a", " ", "!", "[", "]", "(", ")", "](", "![", "![i](s)", "[l](u)"]
+        for _ in range(5000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 16)))
+            start = rng.randint(0, len(text))
+            end = rng.randint(start, len(text))
+            for image, pattern in ((True, REFERENCE_IMAGE_PATTERN), (False, REFERENCE_LINK_PATTERN)):
+                self.assertEqual(
+                    list(iter_bracketed(text, image, start, end)), self.reference(pattern, text, start, end),
+                    msg=(text, image, start, end),
+                )
+
+
+    def test_unclosed_brackets(self):
+        self.assertEqual(list(iter_bracketed("[" * 1000 + "](x)", False)), [(0, 1004, "[" * 999, "x")])
+        self.assertEqual(list(iter_bracketed("![" * 1000, True)), [])
+        self.assertEqual(text_to_textnodes("[" * 1000), [TextNode("[" * 1000, TextType.TEXT)])
+
+
 if __name__ == "__main__":
     unittest.main()
 
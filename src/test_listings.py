@@ -0,0 +1,75 @@
+import os
+import unittest
+import xml.etree.ElementTree as ElementTree
+from listings import write_listings, find_sections, atom_feed, SITEMAP_NAME, FEED_NAME
+from metadata import PageIndex
+from sitefixture import SiteTestCase
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+class TestListings(SiteTestCase):
+    PAGES = {
+        "index.md": "# Home & Garden\n\nWelcome",
+        "blog/tom/index.md": "---\ndate: 2024-06-01\n---\n# Tom <3\n\nPost",
+        "blog/old.md": "---\ndate: 2023-01-01\n---\n# Old\n\nPost",
+    }
+
+    def build(self, site_url="https://example.com", sections=True):
+        index = PageIndex()
+        manifest = super().build("/site/", index=index)
+        return write_listings(index, self.docs, self.template, "/site/", manifest, site_url, sections)
+
+
+    def test_sitemap_lists_pages_and_sections(self):
+        self.build()
+        urlset = ElementTree.fromstring(self.read(SITEMAP_NAME))
+        locs = [url[0].text for url in urlset]
+        self.assertEqual(locs, [
+            "https://example.com/site/",
+            "https://example.com/site/blog/",
+            "https://example.com/site/blog/old.html",
+            "https://example.com/site/blog/tom/",
+        ])
+        self.assertEqual(urlset[3][1].text, "2024-06-01")
+
+
+    def test_feed_has_dated_pages_newest_first(self):
+        self.build()
+        feed = ElementTree.fromstring(self.read(FEED_NAME))
+        self.assertEqual(feed.find(f"{ATOM}title").text, "Home & Garden")
+        self.assertEqual([entry.find(f"{ATOM}title").text for entry in feed.iter(f"{ATOM}entry")], ["Tom <3", "Old"])
+        self.assertEqual(feed.find(f"{ATOM}updated").text, "2024-06-01T00:00:00Z")
+        self.assertIsNone(atom_feed([{"url": "/", "title": "x", "date": None, "fields": {}}], "https://e.com", "/", "x"))
+
+
+    def test_section_page_lists_its_pages(self):
+        self.build()
+        html = self.read(os.path.join("blog", "index.html"))
+        self.assertEqual(
+            html,
+            '<title>Blog</title><ul><li><a href="/site/blog/tom/">Tom <3</a> <time datetime="2024-06-01">2024-06-01</time></li>'
+            '<li><a href="/site/blog/old.html">Old</a> <time datetime="2023-01-01">2023-01-01</time></li></ul>',
+        )
+        self.assertEqual(list(find_sections([{"url": "/"}, {"url": "/about.html"}])), [])
+
+
+    def test_unchanged_listings_are_not_rewritten(self):
+        self.assertEqual(self.build(), 3)
+        os.utime(os.path.join(self.docs, SITEMAP_NAME), ns=(0, 0))
+        self.assertEqual(self.build(), 0)
+        self.assertEqual(os.stat(os.path.join(self.docs, SITEMAP_NAME)).st_mtime_ns, 0)
+        self.write(os.path.join(self.content, "blog", "old.md"), "---\ndate: 2023-01-01\n---\n# Old\n\nEdited body")
+        self.assertEqual(self.build(), 0)
+
+
+    def test_listings_no_longer_wanted_are_removed(self):
+        self.build()
+        self.write(os.path.join(self.content, "blog", "index.md"), "# My blog\n\nHand written")
+        self.build(site_url=None)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, SITEMAP_NAME)))
+        self.assertIn("Hand written", self.read(os.path.join("blog", "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
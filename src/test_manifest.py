@@ -0,0 +1,108 @@
+import os
+import unittest
+from unittest import mock
+from assets import AssetMap
+from sitefixture import SiteTestCase
+
+
+class TestIncrementalBuild(SiteTestCase):
+    TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+    PAGES = {"index.md": "# Home\n\nWelcome", "blog/post.md": "# Post\n\nHello"}
+
+    def mtimes(self):
+        return {
+            name: os.stat(os.path.join(self.docs, name)).st_mtime_ns
+            for name in ("index.html", os.path.join("blog", "post.html"))
+        }
+
+
+    def test_first_build_records_every_page(self):
+        manifest = self.build()
+        self.assertEqual(sorted(manifest.pages), ["blog/post.html", "index.html"])
+        self.assertIn("<h1>Post</h1>", self.read(os.path.join(self.docs, "blog", "post.html")))
+
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build()
+        before = self.mtimes()
+        os.utime(os.path.join(self.docs, "index.html"), ns=(0, 0))
+        os.utime(os.path.join(self.docs, "blog", "post.html"), ns=(0, 0))
+        self.build()
+        self.assertEqual(set(self.mtimes().values()), {0})
+        self.assertNotEqual(before, self.mtimes())
+
+
+    def test_changed_page_is_rebuilt(self):
+        self.build()
+        os.utime(os.path.join(self.docs, "index.html"), ns=(0, 0))
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nEdited")
+        self.build()
+        self.assertEqual(self.mtimes()["index.html"], 0)
+        self.assertIn("Edited", self.read(os.path.join(self.docs, "blog", "post.html")))
+
+
+    def test_template_change_rebuilds_everything(self):
+        self.build()
+        self.write(self.template, "<h6>{{ Title }}</h6>{{ Content }}")
+        self.build()
+        self.assertTrue(self.read(os.path.join(self.docs, "index.html")).startswith("<h6>Home</h6>"))
+        self.assertTrue(self.read(os.path.join(self.docs, "blog", "post.html")).startswith("<h6>Post</h6>"))
+
+
+    def test_base_path_change_rebuilds_everything(self):
+        self.write(self.template, '<a href="/">{{ Title }}</a>{{ Content }}')
+        self.build()
+        self.build("/site/")
+        self.assertIn('href="/site/"', self.read(os.path.join(self.docs, "blog", "post.html")))
+
+
+    def test_asset_map_change_rebuilds_everything(self):
+        self.write(self.template, '<link href="/index.css">{{ Content }}')
+        self.build(assets=AssetMap({"/index.css": "/index.11111111.css"}))
+        self.build(assets=AssetMap({"/index.css": "/index.22222222.css"}))
+        self.assertIn('href="/index.22222222.css"', self.read(os.path.join(self.docs, "blog", "post.html")))
+
+
+    def test_renderer_change_rebuilds_everything(self):
+        self.build()
+        os.utime(os.path.join(self.docs, "index.html"), ns=(0, 0))
+        with mock.patch("gencontent.parser_version", return_value="0123456789abcdef"):
+            manifest = self.build()
+        self.assertEqual(manifest.renderer, "0123456789abcdef")
+        self.assertNotEqual(self.mtimes()["index.html"], 0)
+
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        manifest = self.build()
+        self.assertEqual(list(manifest.pages), ["index.html"])
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog")))
+
+
+    def test_deleted_source_removed_while_inputs_change(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.write(self.template, "<h6>{{ Title }}</h6>{{ Content }}")
+        manifest = self.build()
+        self.assertEqual(list(manifest.pages), ["index.html"])
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog", "post.html")))
+        self.assertTrue(self.read(os.path.join(self.docs, "index.html")).startswith("<h6>Home</h6>"))
+
+
+    def test_missing_output_is_regenerated(self):
+        self.build()
+        os.remove(os.path.join(self.docs, "index.html"))
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+
+
+    def test_corrupt_manifest_is_ignored(self):
+        os.makedirs(self.docs)
+        self.write(self.manifest_path, "{not json")
+        manifest = self.build()
+        self.assertEqual(len(manifest.pages), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
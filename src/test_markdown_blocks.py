@@ -1,8 +1,18 @@
+import io
+import random
 import unittest
+import markdown_blocks
+from htmlnode import LeafNode
 from markdown_blocks import (
     BlockType,
+    markdown_to_html_node,
+    register_block_type,
+    is_heading,
+    is_code,
     markdown_to_blocks,
     block_to_block_type,
+    iter_markdown_blocks,
+    iter_classified_blocks,
 )
 
 
@@ -146,5 +156,70 @@ This is the same paragraph on a new line
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
 
+class TestStreamingBlocks(unittest.TestCase):
+    def test_file_lines_match_markdown_to_blocks(self):
+        md = "\n# Title\n\n\n\npara one\nline two  \n \n  \n- a\n- b\n\n\n"
+        self.assertEqual(list(iter_markdown_blocks(io.StringIO(md))), markdown_to_blocks(md))
+
+
+    def test_random_documents_match_markdown_to_blocks(self):
+        rng = random.Random(42)
+        pieces = ["\n", "\n\n", " ", "a", "- x", "> q", "1. y", "```", "\t"]
+        for _ in range(2000):
+            md = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 20)))
+            self.assertEqual(list(iter_markdown_blocks(io.StringIO(md))), markdown_to_blocks(md), msg=repr(md))
+
+
+    def test_iter_classified_blocks(self):
+        md = "# Title\n\n> quote\n\n- a\n- b\n\n1. one\n2. two\n\ntext"
+        self.assertEqual(
+            [block_type for _, block_type in iter_classified_blocks(io.StringIO(md))],
+            [BlockType.HEADING, BlockType.QUOTE, BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST, BlockType.PARAGRAPH],
+        )
+
+
+def reference_block_type(block):
+    lines = block.split("\n")
+    if is_heading(block):
+        return BlockType.HEADING
+    if is_code(block):
+        return BlockType.CODE
+    if all(line.startswith(">") for line in lines):
+        return BlockType.QUOTE
+    if all(line.startswith("- ") for line in lines):
+        return BlockType.UNORDERED_LIST
+    if all(line.startswith(f"{i+1}. ") for i, line in enumerate(lines)):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+
+class TestBlockRules(unittest.TestCase):
+    def tearDown(self):
+        markdown_blocks.BLOCK_RENDERERS.pop("rule", None)
+        markdown_blocks.BLOCK_RULES["-"] = [
+            rule for rule in markdown_blocks.BLOCK_RULES["-"] if rule[1] != "rule"
+        ]
+
+
+    def test_random_blocks_match_reference(self):
+        rng = random.Random(7)
+        pieces = ["#", "# ", "```", ">", "- ", "-", "1. ", "2. ", "10. ", "1.", "a", " ", "\n"]
+        for _ in range(5000):
+            block = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 10)))
+            self.assertEqual(block_to_block_type(block), reference_block_type(block), msg=repr(block))
+
+
+    def test_ordered_list_past_nine(self):
+        block = "\n".join(f"{i}. item" for i in range(1, 13))
+        self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
+
+
+    def test_register_custom_block_type(self):
+        register_block_type("rule", lambda block: LeafNode("hr", ""), lambda block: block == "---", "-")
+        self.assertEqual(block_to_block_type("---"), "rule")
+        self.assertEqual(block_to_block_type("- item"), BlockType.UNORDERED_LIST)
+        self.assertEqual(markdown_to_html_node("a\n\n---").to_html(), "<div><p>a</p><hr></hr></div>")
+
+
 if __name__ == "__main__":
     unittest.main()
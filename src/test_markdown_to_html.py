@@ -1,5 +1,7 @@
+import io
 import unittest
 from markdown_blocks import (
+    MarkdownStream,
     BlockType,
     markdown_to_html_node,
     markdown_to_blocks,
@@ -317,6 +319,20 @@ class TestMarkdownToHtmlNode(unittest.TestCase):
             self.assertEqual(result.children[0].children[0].value, "Item 1")  # After ". "
 
 
+class TestMarkdownStream(unittest.TestCase):
+    def test_stream_matches_markdown_to_html_node(self):
+        md = "# Title\n\nSome **bold** and [a link](/x)\n\n> quoted\n\n```\ncode\n```\n\n1. one\n2. two"
+        sink = io.StringIO()
+        MarkdownStream(io.StringIO(md)).write_to(sink)
+        self.assertEqual(sink.getvalue(), markdown_to_html_node(md).to_html())
+
+
+    def test_stream_applies_transform_to_each_block(self):
+        seen = []
+        MarkdownStream(io.StringIO("one\n\ntwo"), lambda node: seen.append(node.tag)).write_to(io.StringIO())
+        self.assertEqual(seen, ["p", "p"])
+
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,116 @@
+import os
+import unittest
+from unittest import mock
+import gencontent
+import metadata
+from gencontent import generate_page, find_pages
+from metadata import PageIndex, split_front_matter, scan_page, page_url
+from sitefixture import SiteTestCase
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split_front_matter(self):
+        fields, body = split_front_matter("---\nTitle: Hello\ndate: 2024-01-02\n---\n# Hi\n\ntext")
+        self.assertEqual(fields, {"title": "Hello", "date": "2024-01-02"})
+        self.assertEqual(body, "# Hi\n\ntext")
+
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Hi\n\n---\n"), ({}, "# Hi\n\n---\n"))
+        self.assertEqual(split_front_matter("---x\n# Hi"), ({}, "---x\n# Hi"))
+
+
+    def test_unclosed_front_matter_is_body(self):
+        self.assertEqual(split_front_matter("---\ntitle: x\n# Hi"), ({}, "---\ntitle: x\n# Hi"))
+
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("docs", "index.html"), "docs"), "/")
+        self.assertEqual(page_url(os.path.join("docs", "blog", "tom", "index.html"), "docs"), "/blog/tom/")
+        self.assertEqual(page_url(os.path.join("docs", "about.html"), "docs"), "/about.html")
+
+
+class TestPageIndex(SiteTestCase):
+    TEMPLATE = "<title>{{ Title }}</title>{{ Content }}<nav>{{ Pages }}</nav>"
+    PAGES = {
+        "index.md": "# Home\n\nWelcome",
+        "blog/old.md": "---\ndate: 2023-01-01\n---\n# Old post\n\nBody",
+        "blog/new.md": "---\ndate: 2024-06-01\n---\n# New post\n\nBody",
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.index_path = os.path.join(self.root, "page-index.json")
+
+
+    def build(self):
+        super().build("/site/", index=PageIndex.load(self.index_path))
+
+
+    def test_scan_reads_only_the_head(self):
+        path = os.path.join(self.root, "big.md")
+        with open(path, 'wb') as f:
+            f.write(b"# Big\n\n" + b"text\n" * 200000 + b"\xff\xfe")
+        self.assertEqual(scan_page(path), {"title": "Big", "date": None, "fields": {}})
+
+
+    def test_unclosed_front_matter_page_is_rendered_as_markdown(self):
+        path = os.path.join(self.content, "rule.md")
+        self.write(path, "---\n\n# Title\n\nBody")
+        self.assertEqual(scan_page(path), {"title": "Title", "date": None, "fields": {}})
+        for threshold in (gencontent.STREAM_THRESHOLD, 0):
+            dest = os.path.join(self.docs, "rule.html")
+            with mock.patch.object(gencontent, "STREAM_THRESHOLD", threshold):
+                generate_page("/", path, self.template, dest)
+            self.assertIn("<title>Title</title><div><p>---</p><h1>Title</h1><p>Body</p></div>", self.read(dest))
+
+
+    def test_index_is_newest_first_and_cached_by_mtime(self):
+        pages = find_pages(self.content, self.docs)
+        index = PageIndex(self.index_path).update(pages, self.docs)
+        self.assertEqual([page["title"] for page in index.listing()], ["New post", "Old post", "Home"])
+        index.save()
+        with mock.patch.object(metadata, "scan_page") as scan:
+            reloaded = PageIndex.load(self.index_path).update(pages, self.docs)
+        scan.assert_not_called()
+        self.assertEqual(reloaded.digest(), index.digest())
+        self.assertFalse(reloaded.changed)
+
+
+    def test_pages_slot_lists_the_site(self):
+        self.build()
+        html = self.read(os.path.join(self.docs, "index.html"))
+        self.assertIn(
+            '<nav><ul><li><a href="/site/blog/new.html">New post</a> <time datetime="2024-06-01">2024-06-01</time></li>',
+            html,
+        )
+        self.assertIn("<title>Old post</title>", self.read(os.path.join(self.docs, "blog", "old.html")))
+        self.assertNotIn("date:", self.read(os.path.join(self.docs, "blog", "old.html")))
+
+
+    def test_title_change_rebuilds_listing_pages_but_body_change_does_not(self):
+        self.build()
+        os.utime(os.path.join(self.docs, "index.html"), ns=(0, 0))
+        self.write(os.path.join(self.content, "blog", "new.md"), "---\ndate: 2024-06-01\n---\n# New post\n\nEdited")
+        self.build()
+        self.assertEqual(os.stat(os.path.join(self.docs, "index.html")).st_mtime_ns, 0)
+        self.write(os.path.join(self.content, "blog", "new.md"), "---\ndate: 2024-06-01\n---\n# Renamed\n\nEdited")
+        self.build()
+        self.assertIn("Renamed", self.read(os.path.join(self.docs, "index.html")))
+
+
+    def test_front_matter_fields_are_template_slots(self):
+        self.write(self.template, "<title>{{ Title }}</title><meta content=\"{{ Description }}\">{{ Content }}")
+        page = os.path.join(self.content, "about.md")
+        self.write(page, "---\ntitle: About us\ndescription: Who we are\n---\n# About\n\nText")
+        dest = os.path.join(self.docs, "about.html")
+        generate_page("/", page, self.template, dest)
+        html = self.read(dest)
+        self.assertEqual(html, '<title>About us</title><meta content="Who we are"><div><h1>About</h1><p>Text</p></div>')
+        with mock.patch.object(gencontent, "STREAM_THRESHOLD", 0):
+            generate_page("/", page, self.template, dest)
+        self.assertEqual(self.read(dest), html)
+
+
+if __name__ == "__main__":
+    unittest.main()
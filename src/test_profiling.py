@@ -0,0 +1,62 @@
+import json
+import os
+import unittest
+from gencontent import generate_pages_recursive
+from cache import ContentCache
+from profiling import Profiler, PAGE_STAGES, CACHE_STAGES, format_summary
+from sitefixture import SiteTestCase
+
+
+class TestProfiler(SiteTestCase):
+    TEMPLATE = '<a href="/">{{ Title }}</a>{{ Content }}'
+    PAGES = {f"page{i}.md": f"# Page {i}\n\n" + "Some **bold** text.\n\n" * (i + 1) for i in range(3)}
+
+    def test_profiled_build_matches_normal_build(self):
+        plain = os.path.join(self.root, "plain")
+        profiled = os.path.join(self.root, "profiled")
+        generate_pages_recursive("/base/", self.content, self.template, plain)
+        generate_pages_recursive("/base/", self.content, self.template, profiled, profiler=Profiler())
+        self.assertEqual(self.snapshot(plain), self.snapshot(profiled))
+
+
+    def test_report_covers_every_stage(self):
+        profiler = Profiler()
+        with profiler.stage("static_copy"):
+            pass
+        generate_pages_recursive("/", self.content, self.template, os.path.join(self.root, "docs"), profiler=profiler)
+        report = profiler.report(top=2)
+        self.assertEqual(set(report["stages"]), set(PAGE_STAGES) | {"static_copy"})
+        self.assertEqual(report["stages"]["read"]["count"], 3)
+        self.assertEqual(len(report["pages"]), 3)
+        self.assertEqual(len(report["slowest"]), 2)
+        self.assertGreaterEqual(report["slowest"][0]["total_ms"], report["slowest"][1]["total_ms"])
+        self.assertIn("Slowest 2 pages:", format_summary(report))
+
+
+    def test_write_report_and_trace(self):
+        profiler = Profiler()
+        generate_pages_recursive("/", self.content, self.template, os.path.join(self.root, "docs"), jobs=2, profiler=profiler)
+        report_path = os.path.join(self.root, "profile.json")
+        trace_path = os.path.join(self.root, "profile.trace.json")
+        profiler.write(report_path, trace_path)
+        with open(report_path, 'r') as f:
+            self.assertEqual(len(json.load(f)["pages"]), 3)
+        with open(trace_path, 'r') as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual(len(events), 3 * len(PAGE_STAGES))
+        self.assertTrue(all(event["ph"] == "X" and event["dur"] >= 0 for event in events))
+
+
+    def test_cache_hits_skip_parse_stages(self):
+        cache = ContentCache(os.path.join(self.root, "cache"))
+        dest = os.path.join(self.root, "docs")
+        cold = Profiler()
+        generate_pages_recursive("/", self.content, self.template, dest, profiler=cold, cache=cache)
+        self.assertEqual(set(cold.report()["stages"]), set(PAGE_STAGES) | set(CACHE_STAGES))
+        warm = Profiler()
+        generate_pages_recursive("/", self.content, self.template, dest, profiler=warm, cache=cache)
+        self.assertEqual(set(warm.report()["stages"]), {"read", "cache_read", "template", "write"})
+
+
+if __name__ == "__main__":
+    unittest.main()
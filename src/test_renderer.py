@@ -0,0 +1,89 @@
+import threading
+import unittest
+from unittest import mock
+import markdown_blocks
+from markdown_blocks import markdown_to_html_node, register_block_type
+from renderer import Renderer
+from assets import AssetMap
+
+
+class TestRenderer(unittest.TestCase):
+    def setUp(self):
+        self.renderer = Renderer(max_entries=2)
+
+
+    def test_matches_markdown_to_html_node(self):
+        markdown = "# Hi\n\nSome **bold** and [a link](https://example.com)\n\n- one\n- two\n\n```\ncode\n```"
+        self.assertEqual(self.renderer.render(markdown), markdown_to_html_node(markdown).to_html())
+
+
+    def test_rewrites_root_urls(self):
+        renderer = Renderer("/site/", AssetMap({"/a.css": "/a.1234.css"}, {"/cat.png": (4, 3)}))
+        self.assertEqual(
+            renderer.render("[home](/) ![cat](/cat.png) [style](/a.css)"),
+            '<div><p><a href="/site/">home</a> <img src="/site/cat.png" alt="cat" width="4" height="3"></img>'
+            ' <a href="/site/a.1234.css">style</a></p></div>',
+        )
+
+
+    def test_repeated_input_is_not_parsed_again(self):
+        first = self.renderer.render("_hi_")
+        with mock.patch("renderer.markdown_to_blocks") as split:
+            second = self.renderer.render("_hi_")
+        split.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual((self.renderer.hits, self.renderer.misses), (1, 1))
+
+
+    def test_cache_is_bounded_lru(self):
+        for markdown in ("a", "b", "a", "c"):
+            self.renderer.render(markdown)
+        self.assertEqual(list(self.renderer.entries), ["a", "c"])
+
+
+    def test_render_node_returns_fresh_trees(self):
+        first = self.renderer.render_node("x")
+        first.children[0].tag = "span"
+        self.assertEqual(self.renderer.render_node("x").to_html(), "<div><p>x</p></div>")
+
+
+    def test_render_many(self):
+        with mock.patch.object(self.renderer, "render", wraps=self.renderer.render) as render:
+            results = self.renderer.render_many(iter(["a", "**b**", "a"]))
+        self.assertEqual(results, ["<div><p>a</p></div>", "<div><p><b>b</b></p></div>", "<div><p>a</p></div>"])
+        self.assertEqual(render.call_count, 2)
+
+
+    def test_invalid_markdown_raises_and_is_not_cached(self):
+        with self.assertRaises(ValueError):
+            self.renderer.render("**open")
+        self.assertEqual(len(self.renderer.entries), 0)
+
+
+    def test_block_rules_are_a_snapshot(self):
+        renderer = Renderer()
+        with mock.patch.dict(markdown_blocks.BLOCK_RULES), mock.patch.dict(markdown_blocks.BLOCK_RENDERERS):
+            register_block_type("shout", lambda block: markdown_to_html_node(block.upper()).children[0], lambda _: True, "!")
+            self.assertEqual(renderer.render("!hey"), "<div><p>!hey</p></div>")
+
+
+    def test_shared_across_threads(self):
+        renderer = Renderer(max_entries=8)
+        inputs = [f"# Page {i % 12}\n\n[link](/p/{i % 12})" for i in range(200)]
+        expected = [markdown_to_html_node(markdown).to_html() for markdown in inputs]
+        results = [None] * 4
+
+        def work(slot):
+            results[slot] = renderer.render_many(inputs)
+
+        threads = [threading.Thread(target=work, args=(slot,)) for slot in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [expected] * 4)
+        self.assertLessEqual(len(renderer.entries), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
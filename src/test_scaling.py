@@ -0,0 +1,139 @@
+import gc
+import math
+import time
+import unittest
+from textnode import TextNode, TextType
+from inline_markdown import text_to_textnodes, split_nodes_delimiter, split_nodes_link, split_nodes_image
+from markdown_blocks import markdown_to_html_node
+
+# Each input is timed at these multiples of its base size; doubling steps keep the fit well spread
+SCALES = (1, 2, 4, 8)
+REPEATS = 3
+# Small inputs run in a loop until one sample takes at least this long
+MIN_SAMPLE_TIME = 0.002
+# Linear work fits near 1.0; timer noise stays well under this, a quadratic stage lands near 2.0
+MAX_EXPONENT = 1.4
+
+
+def call(function, argument, number):
+    # CPU time of this process, so other processes competing for the CPU cannot inflate a sample
+    start = time.process_time()
+    for _ in range(number):
+        try:
+            function(argument)
+        except ValueError:
+            pass
+    return time.process_time() - start
+
+
+def best_time(function, argument):
+    """Seconds per call, the best of REPEATS samples."""
+    gc.disable()
+    try:
+        number = max(1, math.ceil(MIN_SAMPLE_TIME / max(call(function, argument, 1), 1e-9)))
+        return min(call(function, argument, number) for _ in range(REPEATS)) / number
+    finally:
+        gc.enable()
+
+
+def growth_exponent(function, make_input, base_size):
+    """Least-squares slope of log(time) over log(size): how the runtime grows with the input."""
+    points = [(math.log(base_size * scale), math.log(best_time(function, make_input(base_size * scale)))) for scale in SCALES]
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    return (
+        sum((x - mean_x) * (y - mean_y) for x, y in points) /
+        sum((x - mean_x) ** 2 for x, _ in points)
+    )
+
+
+def text_nodes(text):
+    return [TextNode(text, TextType.TEXT)]
+
+
+def render(markdown):
+    return markdown_to_html_node(markdown).to_html()
+
+
+class TestScaling(unittest.TestCase):
+    def assertLinear(self, function, make_input, base_size):
+        exponent = growth_exponent(function, make_input, base_size)
+        if exponent > MAX_EXPONENT:
+            # One retry, so a burst of load on the machine does not fail the build
+            exponent = min(exponent, growth_exponent(function, make_input, base_size))
+        self.assertLessEqual(exponent, MAX_EXPONENT, f"runtime grows as size^{exponent:.2f}")
+
+
+    def test_detects_quadratic_growth(self):
+        def rescan(text):
+            return [text[:end] for end in range(0, len(text), 50)]
+        self.assertGreater(growth_exponent(rescan, lambda n: "x" * 50 * n, 200), MAX_EXPONENT)
+
+
+    def test_many_links_per_paragraph(self):
+        self.assertLinear(text_to_textnodes, lambda n: "see [a link](https://example.com) and " * n, 1000)
+
+
+    def test_many_images_per_paragraph(self):
+        self.assertLinear(text_to_textnodes, lambda n: "![alt](/cat.png) then [a](/b) " * n, 1000)
+
+
+    def test_split_nodes_link(self):
+        self.assertLinear(split_nodes_link, lambda n: text_nodes("text [a](/b) " * n), 1000)
+
+
+    def test_split_nodes_image(self):
+        self.assertLinear(split_nodes_image, lambda n: text_nodes("text ![a](/b.png) " * n), 1000)
+
+
+    def test_repeated_delimiters(self):
+        self.assertLinear(text_to_textnodes, lambda n: "**b** _i_ `c` " * n, 1000)
+
+
+    def test_split_nodes_delimiter(self):
+        self.assertLinear(lambda nodes: split_nodes_delimiter(nodes, "**", TextType.BOLD), lambda n: text_nodes("a **b** " * n), 2000)
+
+
+    def test_unbalanced_delimiter_fails_fast(self):
+        self.assertLinear(text_to_textnodes, lambda n: "_a " * n + "_", 2000)
+        self.assertLinear(lambda nodes: split_nodes_delimiter(nodes, "_", TextType.ITALIC), lambda n: text_nodes("_a " * n + "_"), 2000)
+
+
+    def test_unclosed_link_brackets(self):
+        self.assertLinear(text_to_textnodes, lambda n: "[a](b " * n, 1000)
+
+
+    def test_unclosed_brackets(self):
+        self.assertLinear(text_to_textnodes, lambda n: "[" * n, 4000)
+        self.assertLinear(split_nodes_link, lambda n: text_nodes("[" * n), 4000)
+
+
+    def test_unclosed_image_brackets(self):
+        self.assertLinear(text_to_textnodes, lambda n: "![" * n, 2000)
+        self.assertLinear(split_nodes_image, lambda n: text_nodes("![" * n), 2000)
+
+
+    def test_long_quote_block(self):
+        self.assertLinear(render, lambda n: "> quoted **line** here\n" * n, 500)
+
+
+    def test_long_unordered_list(self):
+        self.assertLinear(render, lambda n: "- item with [a link](/x)\n" * n, 500)
+
+
+    def test_long_ordered_list(self):
+        self.assertLinear(render, lambda n: "".join(f"{i}. item\n" for i in range(1, n + 1)), 500)
+
+
+    def test_huge_code_fence(self):
+        # A fence is only copied, never parsed; past ~128 KiB the allocator switches to mmap and
+        # every copy pays for fresh pages, a constant-factor step that would read as super-linear
+        self.assertLinear(render, lambda n: "```\n" + "x = [a](b) **c** _d\n" * n + "```", 250)
+
+
+    def test_many_blocks(self):
+        self.assertLinear(render, lambda n: "# Heading\n\nA paragraph with `code`.\n\n" * n, 250)
+
+
+if __name__ == "__main__":
+    unittest.main()
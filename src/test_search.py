@@ -0,0 +1,124 @@
+import os
+import json
+import shutil
+import tempfile
+import subprocess
+import unittest
+from cache import ContentCache
+from gencontent import render_content
+from markdown_blocks import markdown_to_html_node
+from search import SearchIndex, content_terms, delta_encode, delta_decode, tokenize
+from sitefixture import SiteTestCase
+
+
+class TestSearchTerms(unittest.TestCase):
+    def test_tree_and_cached_html_give_the_same_terms(self):
+        markdown = "# Title\n\nSome **bold**text and a [link](/x) with `codespan`.\n\n- Item one\n- item two"
+        node = markdown_to_html_node(markdown)
+        self.assertEqual(content_terms(node), content_terms(node.to_html()))
+        self.assertEqual(
+            content_terms(node), ["and", "bold", "codespan", "item", "link", "one", "some", "text", "title", "two", "with"],
+        )
+
+
+    def test_unescaped_angle_brackets_give_the_same_terms(self):
+        markdown = "[< Back Home](/) and 1 < 2\n\n```\n<div class=\"x\">inside</div>\n```"
+        node = markdown_to_html_node(markdown)
+        self.assertEqual(content_terms(node), content_terms(node.to_html()))
+        self.assertIn("back", content_terms(node))
+        self.assertIn("inside", content_terms(node))
+
+
+    def test_cached_render_terms_match(self):
+        markdown = "# Hi\n\n![pic](/a.png) caption [home](/)"
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ContentCache(tmp)
+            uncached = content_terms(render_content(markdown, "/site/"))
+            render_content(markdown, "/site/", cache)
+            self.assertEqual(content_terms(render_content(markdown, "/site/", cache)), uncached)
+
+
+    def test_delta_encoding(self):
+        self.assertEqual(delta_encode([7, 2, 3, 40]), [2, 1, 4, 33])
+        self.assertEqual(delta_decode(delta_encode([7, 2, 3, 40])), [2, 3, 7, 40])
+
+
+class TestSearchIndex(SiteTestCase):
+    PAGES = {"index.md": "# Home\n\nWelcome to the hobbit site", "blog/tom.md": "# Tom\n\nBombadil sings"}
+
+    def setUp(self):
+        super().setUp()
+        self.state = os.path.join(self.root, "search-state.json")
+
+
+    def shard(self, prefix):
+        return json.loads(self.read(os.path.join("search", f"{prefix}.json")))
+
+
+    def build(self):
+        search = SearchIndex.load(self.state)
+        super().build("/site/", search=search)
+        return search
+
+
+    def test_postings_are_sharded_by_prefix(self):
+        search = self.build()
+        tom = search.ids["/blog/tom.html"]
+        self.assertEqual(self.shard("bo"), {"bombadil": [tom]})
+        self.assertEqual(self.shard("ho"), {"home": [search.ids["/"]], "hobbit": [search.ids["/"]]})
+        with open(os.path.join(self.docs, "search", "index.json"), 'r') as f:
+            self.assertIn("bo", json.load(f)["shards"])
+        with open(os.path.join(self.docs, "search", "pages.json"), 'r') as f:
+            self.assertEqual(json.load(f)[str(tom)], ["/site/blog/tom.html", "/blog/tom.html"])
+
+
+    def test_only_changed_pages_and_shards_are_rewritten(self):
+        first = self.build()
+        ids = dict(first.ids)
+        shard_path = os.path.join(self.docs, "search", "ho.json")
+        os.utime(shard_path, ns=(0, 0))
+        self.write(os.path.join(self.content, "blog", "tom.md"), "# Tom\n\nBombadil dances")
+        search = self.build()
+        self.assertEqual(search.ids, ids)
+        self.assertEqual(os.stat(shard_path).st_mtime_ns, 0)
+        self.assertEqual(self.shard("da"), {"dances": [ids["/blog/tom.html"]]})
+        self.assertEqual(self.shard("si"), {"site": [ids["/"]]})
+
+
+    def test_deleted_page_leaves_the_index_and_its_id_is_not_reused(self):
+        first = self.build()
+        os.remove(os.path.join(self.content, "blog", "tom.md"))
+        self.build()
+        self.write(os.path.join(self.content, "about.md"), "# About\n\nBombadil")
+        search = self.build()
+        self.assertNotIn("/blog/tom.html", search.ids)
+        self.assertEqual(search.ids["/about.html"], first.next_id)
+        self.assertEqual(self.shard("bo"), {"bombadil": [first.next_id]})
+
+
+    @unittest.skipUnless(shutil.which("node"), "needs node to run search.js")
+    def test_search_script_finds_non_ascii_terms(self):
+        text = "Café Zürich naïve 東京 𠮷野家 v2"
+        self.write(os.path.join(self.content, "blog", "tom.md"), f"# Tom\n\n{text}")
+        self.build().write(self.docs, "/site/")
+        # search.js with a fetch that reads the shards from disk
+        script = """
+            const fs = require("fs"), path = require("path"), url = require("url");
+            const [dir, text] = process.argv.slice(1);
+            globalThis.document = {currentScript: {src: url.pathToFileURL(path.join(dir, "search.js")).href}};
+            globalThis.fetch = async (location) => ({json: async () => JSON.parse(fs.readFileSync(location, "utf8"))});
+            (0, eval)(fs.readFileSync(path.join(dir, "search.js"), "utf8"));
+            Promise.all(searchTerms(text).map((term) => search(term))).then((hits) => {
+                console.log(JSON.stringify({terms: searchTerms(text), hits}));
+            });
+        """
+        result = subprocess.run(
+            ["node", "-e", script, os.path.join(self.docs, "search"), text], capture_output=True, text=True, check=True,
+        )
+        output = json.loads(result.stdout)
+        self.assertEqual(output["terms"], tokenize(text))
+        self.assertEqual([[url for url, _ in pages] for pages in output["hits"]], [["/site/blog/tom.html"]] * 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,195 @@
+import os
+import gzip
+import tempfile
+import threading
+import unittest
+import time
+import http.client
+import urllib.request
+from unittest import mock
+from server import (
+    ReloadBroker, DocsHandler, inject_reload_script, make_server, serve_in_thread, parse_range, accepts_gzip,
+    RELOAD_SCRIPT, RELOAD_PATH, SENDFILE_MIN_SIZE,
+)
+
+
+class TestLiveReload(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.tmp.name, "index.html"), 'w') as f:
+            f.write("<html><body><p>hi</p></body></html>")
+        self.reloads = ReloadBroker()
+        self.server = make_server(self.tmp.name, 0, "127.0.0.1", self.reloads)
+        serve_in_thread(self.server)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+
+    def test_inject_reload_script(self):
+        self.assertEqual(inject_reload_script(b"<body></body>"), b"<body>" + RELOAD_SCRIPT + b"</body>")
+        self.assertEqual(inject_reload_script(b"<p>"), b"<p>" + RELOAD_SCRIPT)
+
+
+    def test_html_pages_get_reload_script(self):
+        with urllib.request.urlopen(self.base + "/") as response:
+            body = response.read()
+        self.assertIn(RELOAD_SCRIPT, body)
+        self.assertEqual(int(response.headers["Content-Length"]), len(body))
+
+
+    def test_reload_stream_fires_on_notify(self):
+        with urllib.request.urlopen(self.base + RELOAD_PATH, timeout=5) as response:
+            threading.Timer(0.05, self.reloads.notify).start()
+            self.assertEqual(response.readline(), b"data: reload\n")
+
+
+    def test_broker_wait_times_out(self):
+        self.assertEqual(self.reloads.wait(0, timeout=0.01), 0)
+        self.reloads.notify()
+        self.assertEqual(self.reloads.wait(0, timeout=0.01), 1)
+
+
+class TestServe(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.css = b"body { margin: 0 }\n" * 100
+        self.write("index.css", self.css)
+        self.write("index.css.gz", gzip.compress(self.css))
+        stat = os.stat(os.path.join(self.tmp.name, "index.css"))
+        os.utime(os.path.join(self.tmp.name, "index.css.gz"), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.write("index.html", b"<html><body>hi</body></html>")
+        self.server = make_server(self.tmp.name, 0, "127.0.0.1")
+        serve_in_thread(self.server)
+        self.connection = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+
+    def write(self, name, data):
+        with open(os.path.join(self.tmp.name, name), 'wb') as f:
+            f.write(data)
+
+
+    def get(self, path, method="GET", **headers):
+        self.connection.request(method, path, headers={name.replace("_", "-"): value for name, value in headers.items()})
+        response = self.connection.getresponse()
+        return response, response.read()
+
+
+    def test_etag_and_last_modified_give_304(self):
+        response, body = self.get("/index.css")
+        self.assertEqual((response.status, body), (200, self.css))
+        etag = response.getheader("ETag")
+        self.assertEqual(self.get("/index.css", If_None_Match=etag)[0].status, 304)
+        self.assertEqual(self.get("/index.css", If_Modified_Since=response.getheader("Last-Modified"))[0].status, 304)
+        self.assertEqual(self.get("/index.css", If_None_Match='"other"')[0].status, 200)
+
+
+    def test_gzip_sibling_is_served_when_accepted(self):
+        response, body = self.get("/index.css", Accept_Encoding="br, gzip")
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(gzip.decompress(body), self.css)
+        self.assertEqual(response.getheader("Content-Type"), "text/css")
+        response, body = self.get("/index.css", Accept_Encoding="gzip;q=0")
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(body, self.css)
+
+
+    def test_stale_gzip_sibling_is_ignored(self):
+        os.utime(os.path.join(self.tmp.name, "index.css.gz"), ns=(1, 1))
+        response, body = self.get("/index.css", Accept_Encoding="gzip")
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(body, self.css)
+
+
+    def test_range_requests(self):
+        response, body = self.get("/index.css", Range="bytes=5-9", Accept_Encoding="gzip")
+        self.assertEqual((response.status, body), (206, self.css[5:10]))
+        self.assertEqual(response.getheader("Content-Range"), f"bytes 5-9/{len(self.css)}")
+        self.assertEqual(self.get("/index.css", Range="bytes=-4")[1], self.css[-4:])
+        self.assertEqual(self.get("/index.css", Range=f"bytes={len(self.css)}-")[0].status, 416)
+        self.assertEqual(self.get("/index.css", Range="bytes=0-1", If_Range='"old"')[0].status, 200)
+
+
+    def test_large_files_use_sendfile(self):
+        data = os.urandom(SENDFILE_MIN_SIZE * 2)
+        self.write("big.bin", data)
+        with mock.patch("socket.socket.sendfile", autospec=True, side_effect=lambda sock, f, offset, count: sock.sendall(f.read(count))) as sendfile:
+            response, body = self.get("/big.bin")
+        self.assertEqual(body, data)
+        sendfile.assert_called_once()
+
+
+    def test_fingerprinted_files_are_immutable(self):
+        self.write("index.0123abcd.css", self.css)
+        self.assertIn("immutable", self.get("/index.0123abcd.css")[0].getheader("Cache-Control"))
+        self.assertEqual(self.get("/index.css")[0].getheader("Cache-Control"), "no-cache")
+
+
+    def test_head_and_keep_alive(self):
+        response, body = self.get("/", method="HEAD")
+        self.assertEqual((response.status, body), (200, b""))
+        self.assertEqual(int(response.getheader("Content-Length")), 28)
+        self.assertEqual(self.get("/")[1], b"<html><body>hi</body></html>")
+        self.assertEqual(self.get("/missing.html")[0].status, 404)
+
+
+    def test_requests_are_logged_with_latency(self):
+        with mock.patch.object(DocsHandler, "log_message") as log_message:
+            self.get("/index.css")
+            # The first request is logged before the kept-alive connection reads the second
+            self.get("/")
+        format, requestline, status, length, elapsed_ms = log_message.call_args_list[0].args
+        self.assertEqual((requestline, status, length), ("GET /index.css HTTP/1.1", 200, len(self.css)))
+        self.assertIn("ms", format)
+
+
+    def test_keep_alive_idle_time_is_not_logged_as_latency(self):
+        with mock.patch.object(DocsHandler, "log_message") as log_message:
+            self.get("/index.css")
+            time.sleep(0.5)
+            self.get("/index.css")
+            self.get("/")
+        elapsed_ms = log_message.call_args_list[1].args[-1]
+        self.assertLess(elapsed_ms, 250)
+
+
+    def test_directory_listing_and_redirect_on_keep_alive(self):
+        os.makedirs(os.path.join(self.tmp.name, "images"))
+        self.write(os.path.join("images", "a.png"), b"png")
+        response, body = self.get("/images/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(len(body), int(response.getheader("Content-Length")))
+        self.assertIn(b"a.png", body)
+        self.assertEqual(self.get("/images")[0].status, 301)
+        self.assertEqual(self.get("/index.css")[1], self.css)
+
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range("bytes=0-", 10), (0, 9))
+        self.assertEqual(parse_range("bytes=2-100", 10), (2, 9))
+        self.assertEqual(parse_range("bytes=-3", 10), (7, 9))
+        self.assertEqual(parse_range("bytes=10-", 10), ())
+        self.assertIsNone(parse_range("bytes=0-1,4-5", 10))
+        self.assertIsNone(parse_range("items=0-1", 10))
+
+
+    def test_accepts_gzip(self):
+        self.assertTrue(accepts_gzip("gzip, deflate"))
+        self.assertTrue(accepts_gzip("*"))
+        self.assertFalse(accepts_gzip("br"))
+        self.assertFalse(accepts_gzip("gzip;q=0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import unittest
+from gencontent import find_pages, generate_pages_recursive, select_shard, shard_of
+from manifest import BuildManifest, shard_manifest_name
+from shard import merge_shards
+from sitefixture import SiteTestCase
+
+
+class TestShard(SiteTestCase):
+    PAGES = {f"section{i % 4}/page{i}.md": f"# Page {i}\n\nText with a [link](/page{i})." for i in range(20)}
+
+    def build_shard(self, shard, dest):
+        manifest = BuildManifest.load(os.path.join(dest, shard_manifest_name(shard)))
+        generate_pages_recursive("/", self.content, self.template, dest, manifest, shard=shard)
+
+
+    def test_find_pages_is_sorted(self):
+        pages = find_pages(self.content, "docs")
+        self.assertEqual(pages, sorted(pages))
+
+
+    def test_shards_partition_the_pages(self):
+        pages = find_pages(self.content, "docs")
+        shards = [select_shard(pages, self.content, (index, 3)) for index in (1, 2, 3)]
+        self.assertEqual(sorted(page for shard in shards for page in shard), pages)
+        self.assertTrue(all(shards))
+        self.assertEqual(shard_of("blog/tom/index.md", 3), shard_of(os.path.join("blog", "tom", "index.md"), 3))
+
+
+    def test_merged_shards_match_a_full_build(self):
+        full = os.path.join(self.root, "full")
+        full_manifest = os.path.join(self.root, "full-manifest.json")
+        generate_pages_recursive("/", self.content, self.template, full, BuildManifest.load(full_manifest, full))
+        shard_dirs = [os.path.join(self.root, f"shard{index}") for index in (1, 2, 3)]
+        for index, shard_dir in enumerate(shard_dirs, 1):
+            self.build_shard((index, 3), shard_dir)
+        docs = os.path.join(self.root, "docs")
+        merged = merge_shards(docs, shard_dirs, os.path.join(self.root, "manifest.json"))
+
+        full_files = self.snapshot(full)
+        expected_manifest = BuildManifest.load(full_manifest, full)
+        self.assertEqual(self.snapshot(docs), full_files)
+        self.assertEqual(
+            {key: entry["hash"] for key, entry in merged.pages.items()},
+            {key: entry["hash"] for key, entry in expected_manifest.pages.items()},
+        )
+        self.assertEqual(sorted(os.listdir(docs)), [f"section{i}" for i in range(4)])
+        self.assertEqual(BuildManifest.load(merged.path, docs).pages, merged.pages)
+
+
+    def test_merge_refuses_missing_or_mismatched_shards(self):
+        docs = os.path.join(self.root, "docs")
+        self.build_shard((1, 2), docs)
+        with self.assertRaisesRegex(ValueError, "missing shards"):
+            merge_shards(docs)
+        with open(self.template, 'w') as f:
+            f.write("<h1>{{ Title }}</h1>{{ Content }}")
+        self.build_shard((2, 2), docs)
+        with self.assertRaisesRegex(ValueError, "different inputs"):
+            merge_shards(docs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import unittest
+from unittest import mock
+from manifest import BuildManifest
+from staticsync import sync_static, copy_range
+from sitefixture import SiteTestCase
+
+
+class TestSyncStatic(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png-bytes")
+        self.manifest = BuildManifest(self.manifest_path, root=self.docs)
+
+
+    def test_first_sync_copies_everything(self):
+        stats = sync_static(self.static, self.docs, self.manifest)
+        self.assertEqual((stats.copied, stats.copied_bytes, stats.skipped), (2, 16, 0))
+        self.assertEqual(self.read(os.path.join(self.docs, "images", "a.png")), "png-bytes")
+        self.assertEqual(self.manifest.assets, ["images/a.png", "index.css"])
+
+
+    def test_unchanged_files_are_skipped(self):
+        sync_static(self.static, self.docs, self.manifest)
+        stats = sync_static(self.static, self.docs, self.manifest)
+        self.assertEqual((stats.copied, stats.skipped, stats.skipped_bytes), (0, 2, 16))
+
+
+    def test_changed_file_is_copied(self):
+        sync_static(self.static, self.docs, self.manifest)
+        css = os.path.join(self.static, "index.css")
+        self.write(css, "body { margin: 0 }")
+        stats = sync_static(self.static, self.docs, self.manifest)
+        self.assertEqual((stats.copied, stats.skipped), (1, 1))
+        self.assertEqual(self.read(os.path.join(self.docs, "index.css")), "body { margin: 0 }")
+
+
+    def test_checksum_mode_ignores_mtime(self):
+        sync_static(self.static, self.docs, self.manifest)
+        os.utime(os.path.join(self.static, "index.css"), ns=(0, 0))
+        self.assertEqual(sync_static(self.static, self.docs, self.manifest).copied, 1)
+        os.utime(os.path.join(self.static, "index.css"), ns=(5, 5))
+        self.assertEqual(sync_static(self.static, self.docs, self.manifest, checksum=True).copied, 0)
+
+
+    def test_orphans_are_removed_but_pages_kept(self):
+        sync_static(self.static, self.docs, self.manifest)
+        self.write(os.path.join(self.docs, "index.html"), "<html></html>")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        stats = sync_static(self.static, self.docs, self.manifest)
+        self.assertEqual(stats.removed, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "images")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+
+
+    def test_hardlink_mode(self):
+        sync_static(self.static, self.docs, self.manifest, copy_mode="hardlink")
+        source = os.stat(os.path.join(self.static, "index.css"))
+        dest = os.stat(os.path.join(self.docs, "index.css"))
+        self.assertEqual(source.st_ino, dest.st_ino)
+
+
+    def test_copy_range(self):
+        source = os.path.join(self.static, "big.bin")
+        with open(source, 'wb') as f:
+            f.write(os.urandom(1 << 16))
+        dest = os.path.join(self.root, "big.bin")
+        copy_range(source, dest)
+        with open(source, 'rb') as a, open(dest, 'rb') as b:
+            self.assertEqual(a.read(), b.read())
+
+
+    def test_fingerprint_renames_and_replaces_changed_assets(self):
+        stats = sync_static(self.static, self.docs, self.manifest, fingerprint=True)
+        css_url = stats.urls["/index.css"]
+        self.assertRegex(css_url, r"^/index\.[0-9a-f]{8}\.css$")
+        self.assertEqual(self.read(os.path.join(self.docs, css_url[1:])), "body {}")
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.css")))
+
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        stats = sync_static(self.static, self.docs, self.manifest, fingerprint=True)
+        self.assertNotEqual(stats.urls["/index.css"], css_url)
+        self.assertEqual(stats.removed, 1)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, css_url[1:])))
+
+
+    def test_fingerprint_hash_is_reused_while_stat_unchanged(self):
+        sync_static(self.static, self.docs, self.manifest, fingerprint=True)
+        with mock.patch("manifest.hash_file") as hash_file:
+            sync_static(self.static, self.docs, self.manifest, fingerprint=True)
+        hash_file.assert_not_called()
+
+
+    def test_unknown_copy_mode(self):
+        with self.assertRaises(ValueError):
+            sync_static(self.static, self.docs, copy_mode="rsync")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import io
+import os
+import tempfile
+import unittest
+from htmlnode import LeafNode, ParentNode
+from template import Template, load_template
+from assets import AssetMap
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render_fills_slots(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(
+            template.render(Title="Home", Content="<p>hi</p>"),
+            "<title>Home</title><main><p>hi</p></main>",
+        )
+
+
+    def test_slot_names(self):
+        template = Template("{{ Title }} {{ Content }} {{ Title }}")
+        self.assertEqual(template.slot_names(), {"Title", "Content"})
+
+
+    def test_unknown_slot_left_as_is(self):
+        self.assertEqual(Template("a {{ Other }} b").render(), "a {{ Other }} b")
+
+
+    def test_base_path_rewrites_template_only(self):
+        template = Template('<link href="/index.css"><img src="/a.png">{{ Content }}', "/site/")
+        html = template.render(Content='<a href="/raw">x</a>')
+        self.assertEqual(html, '<link href="/site/index.css"><img src="/site/a.png"><a href="/raw">x</a>')
+
+
+    def test_write_to_streams_nodes(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}")
+        node = ParentNode("div", [LeafNode("b", "bold")])
+        sink = io.StringIO()
+        template.write_to(sink, Title="Page", Content=node)
+        self.assertEqual(sink.getvalue(), "<h1>Page</h1><div><b>bold</b></div>")
+        self.assertEqual(template.render(Title="Page", Content=node), sink.getvalue())
+
+
+    def test_assets_rewrite_fingerprinted_urls(self):
+        assets = AssetMap({"/index.css": "/index.0123abcd.css"})
+        template = Template('<link href="/index.css?v=1"><a href="/blog/">{{ Content }}', "/site/", assets)
+        self.assertEqual(
+            template.render(Content=""), '<link href="/site/index.0123abcd.css?v=1"><a href="/site/blog/">',
+        )
+
+
+    def test_load_template_is_cached_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, 'w') as f:
+                f.write("<p>{{ Title }}</p>")
+            first = load_template(path, "/")
+            self.assertIs(first, load_template(path, "/"))
+            self.assertIsNot(first, load_template(path, "/other/"))
+            with open(path, 'w') as f:
+                f.write("<h1>{{ Title }}</h1>")
+            os.utime(path, ns=(1, 1))
+            self.assertEqual(load_template(path, "/").render(Title="x"), "<h1>x</h1>")
+
+
+if __name__ == "__main__":
+    unittest.main()
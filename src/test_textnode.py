@@ -23,6 +23,10 @@ class TestTextNode(unittest.TestCase):
         node = TextNode("This is a text node", TextType.IMAGE, "https://www.boot.dev")
         self.assertNotEqual(node.url, None)
 
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 
 class TestTextNodeToHTMLNode(unittest.TestCase):
     def test_text(self):
@@ -0,0 +1,109 @@
+import os
+import time
+import unittest
+from gencontent import generate_pages_recursive
+from manifest import BuildManifest
+from staticsync import sync_static
+from watch import Watcher, Rebuilder
+from sitefixture import SiteTestCase
+from test_imagesize import png_bytes
+
+
+class TestWatch(SiteTestCase):
+    PAGES = {"index.md": "# Home", "blog/post.md": "# Post"}
+
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        # Static files are synced before the pages, as main.py does
+        self.manifest = BuildManifest(self.manifest_path, root=self.docs)
+        sync_static(self.static, self.docs, self.manifest)
+        generate_pages_recursive("/", self.content, self.template, self.docs, self.manifest)
+        self.rebuilder = Rebuilder("/", self.content, self.template, self.static, self.docs, self.manifest)
+        for name in ("index.html", os.path.join("blog", "post.html")):
+            os.utime(os.path.join(self.docs, name), ns=(0, 0))
+
+
+    def mtime(self, name):
+        return os.stat(os.path.join(self.docs, name)).st_mtime_ns
+
+
+    def test_watcher_reports_changed_added_and_deleted_files(self):
+        watcher = Watcher([self.content, self.template])
+        self.assertEqual(watcher.poll(), set())
+        post = os.path.join(self.content, "blog", "post.md")
+        new = os.path.join(self.content, "new.md")
+        self.write(post, "# Post edited")
+        os.utime(post, ns=(1, 1))
+        self.write(new, "# New")
+        os.remove(os.path.join(self.content, "index.md"))
+        self.assertEqual(
+            watcher.poll(),
+            {os.path.normpath(post), os.path.normpath(new), os.path.normpath(os.path.join(self.content, "index.md"))},
+        )
+
+
+    def test_debounce_collects_a_burst(self):
+        watcher = Watcher([self.content])
+        self.write(os.path.join(self.content, "a.md"), "# A")
+        self.write(os.path.join(self.content, "b.md"), "# B")
+        started = time.perf_counter()
+        self.assertEqual(len(watcher.wait_for_changes(0.01, 0.01)), 2)
+        self.assertLess(time.perf_counter() - started, 1)
+
+
+    def test_markdown_edit_rebuilds_one_page(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(post, "# Post\n\nEdited")
+        self.rebuilder.rebuild([post])
+        self.assertIn("Edited", self.read(os.path.join(self.docs, "blog", "post.html")))
+        self.assertEqual(self.mtime("index.html"), 0)
+
+
+    def test_template_change_rebuilds_every_page(self):
+        self.write(self.template, "<h6>{{ Title }}</h6>")
+        self.rebuilder.rebuild([self.template])
+        self.assertEqual(self.read(os.path.join(self.docs, "index.html")), "<h6>Home</h6>")
+        self.assertEqual(self.read(os.path.join(self.docs, "blog", "post.html")), "<h6>Post</h6>")
+
+
+    def test_deleted_markdown_removes_page(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        os.remove(post)
+        self.rebuilder.rebuild([post])
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog", "post.html")))
+        self.assertNotIn("blog/post.html", self.manifest.pages)
+
+
+    def test_asset_change_copies_one_file(self):
+        css = os.path.join(self.static, "index.css")
+        image = os.path.join(self.static, "a.png")
+        self.write(css, "body { margin: 0 }")
+        self.write(image, "png")
+        self.rebuilder.rebuild([css, image])
+        self.assertEqual(self.read(os.path.join(self.docs, "index.css")), "body { margin: 0 }")
+        self.assertIn("a.png", self.manifest.assets)
+        self.assertEqual(self.mtime("index.html"), 0)
+        os.remove(image)
+        self.rebuilder.rebuild([image])
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "a.png")))
+        self.assertNotIn("a.png", self.manifest.assets)
+
+
+    def test_resized_image_rebuilds_every_page(self):
+        image = os.path.join(self.static, "a.png")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n![a](/a.png)")
+        with open(image, 'wb') as f:
+            f.write(png_bytes(10, 20))
+        self.rebuilder.rebuild([image, os.path.join(self.content, "index.md")])
+        self.assertIn('width="10" height="20"', self.read(os.path.join(self.docs, "index.html")))
+        with open(image, 'wb') as f:
+            f.write(png_bytes(30, 40))
+        os.utime(image, ns=(1, 1))
+        self.rebuilder.rebuild([image])
+        self.assertIn('width="30" height="40"', self.read(os.path.join(self.docs, "index.html")))
+        self.assertNotEqual(self.mtime(os.path.join("blog", "post.html")), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
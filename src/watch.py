@@ -0,0 +1,163 @@
+import os, sys, time, argparse
+from gencontent import generate_page, generate_pages_recursive, dest_path_for
+from template import load_template
+from metadata import PageIndex, INDEX_PATH
+from staticsync import sync_file
+from server import ReloadBroker, make_server, serve_in_thread
+from assets import AssetMap, ASSET_MANIFEST_NAME
+from imagesize import image_sizes
+import main as site
+
+
+def take_snapshot(paths):
+    snapshot = {}
+    for path in paths:
+        if os.path.isdir(path):
+            scan_dir(path, snapshot)
+        elif os.path.isfile(path):
+            stat = os.stat(path)
+            snapshot[os.path.normpath(path)] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def scan_dir(path, snapshot):
+    for entry in os.scandir(path):
+        if entry.is_dir():
+            scan_dir(entry.path, snapshot)
+        elif entry.is_file():
+            stat = entry.stat()
+            snapshot[os.path.normpath(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+
+
+class Watcher():
+    def __init__(self, paths):
+        self.paths = paths
+        self.snapshot = take_snapshot(paths)
+
+
+    def poll(self):
+        snapshot = take_snapshot(self.paths)
+        changed = {
+            path for path in snapshot.keys() | self.snapshot.keys()
+            if snapshot.get(path) != self.snapshot.get(path)
+        }
+        self.snapshot = snapshot
+        return changed
+
+
+    def wait_for_changes(self, interval=0.05, debounce=0.03):
+        changed = self.poll()
+        while not changed:
+            time.sleep(interval)
+            changed = self.poll()
+        while True:
+            time.sleep(debounce)
+            more = self.poll()
+            if not more:
+                return changed
+            changed |= more
+
+
+class Rebuilder():
+    def __init__(self, base_path, content_dir, template_path, static_dir, dest_dir, manifest, cache=None, index=None):
+        self.base_path = base_path
+        self.content_dir = os.path.normpath(content_dir)
+        self.template_path = os.path.normpath(template_path)
+        self.static_dir = os.path.normpath(static_dir)
+        self.dest_dir = dest_dir
+        self.manifest = manifest
+        self.cache = cache
+        self.index = index
+        self.assets = AssetMap.load(os.path.join(dest_dir, ASSET_MANIFEST_NAME), image_sizes(static_dir))
+
+
+    def rebuild(self, changed_paths):
+        rebuilt = []
+        changed_paths = sorted(os.path.normpath(path) for path in changed_paths)
+        regenerate = self.template_path in changed_paths
+        if any(is_within(path, self.static_dir) for path in changed_paths):
+            assets = AssetMap(self.assets.urls, image_sizes(self.static_dir))
+            regenerate = regenerate or assets != self.assets
+            self.assets = assets
+        if any(is_within(path, self.content_dir) for path in changed_paths) and self.uses_listing():
+            # Pages share the {{ Pages }} listing, so let the manifest decide which ones it touched
+            regenerate = True
+        if regenerate:
+            generate_pages_recursive(
+                self.base_path, self.content_dir, self.template_path, self.dest_dir, self.manifest,
+                cache=self.cache, assets=self.assets, index=self.index,
+            )
+        if self.template_path in changed_paths:
+            rebuilt.append(self.template_path)
+        for path in changed_paths:
+            if is_within(path, self.content_dir) and path.endswith(".md"):
+                if not regenerate:
+                    self.rebuild_page(path)
+                rebuilt.append(path)
+            elif is_within(path, self.static_dir):
+                relative_path = os.path.relpath(path, self.static_dir)
+                sync_file(path, os.path.join(self.dest_dir, relative_path), self.manifest)
+                rebuilt.append(path)
+        self.manifest.save()
+        return rebuilt
+
+
+    def uses_listing(self):
+        return self.index is not None and "Pages" in load_template(self.template_path, self.base_path, self.assets).slot_names()
+
+
+    def rebuild_page(self, content_path):
+        dest_path = dest_path_for(content_path, self.content_dir, self.dest_dir)
+        if not os.path.isfile(content_path):
+            self.manifest.remove(dest_path)
+            return
+        fresh, source_hash = self.manifest.check(content_path, dest_path)
+        if not fresh:
+            generate_page(
+                self.base_path, content_path, self.template_path, dest_path, cache=self.cache, assets=self.assets,
+            )
+            self.manifest.record(content_path, dest_path, source_hash)
+
+
+def is_within(path, directory):
+    return path.startswith(directory + os.sep)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rebuild the site on every change and reload open browsers")
+    parser.add_argument("base_path", nargs="?", default="/")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between polls")
+    parser.add_argument("--debounce", type=float, default=0.03, help="quiet period that ends a burst of saves")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    manifest = site.build(site.parse_args([args.base_path]))
+    rebuilder = Rebuilder(
+        args.base_path, site.CONTENT_DIR, site.TEMPLATE_PATH, site.STATIC_DIR, site.DEST_DIR, manifest,
+        index=PageIndex.load(INDEX_PATH),
+    )
+    watcher = Watcher([site.CONTENT_DIR, site.STATIC_DIR, site.TEMPLATE_PATH])
+    reloads = ReloadBroker()
+    server = make_server(site.DEST_DIR, args.port, reloads=reloads)
+    serve_in_thread(server)
+    print(f"Watching for changes, serving on http://localhost:{server.server_address[1]}/")
+    try:
+        while True:
+            changed = watcher.wait_for_changes(args.interval, args.debounce)
+            started = time.perf_counter()
+            try:
+                rebuilt = rebuilder.rebuild(changed)
+            except Exception as e:
+                print(f"Rebuild failed: {e}")
+                continue
+            reloads.notify()
+            print(f"Rebuilt {len(rebuilt)} changed inputs in {(time.perf_counter() - started) * 1e3:.1f} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()